@@ -4,87 +4,131 @@ Analyze buying patterns across all JSON files in historical_trades directory.
 Focuses on BUY transactions for Up/Down tokens.
 """
 
-import json
 import os
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import seaborn as sns
 import pandas as pd
 import numpy as np
+from trade_cache import cache_path_for, load_cached, read_all_buys
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; count_transitions falls back to NumPy
+    njit = None
 
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
 
+# Per-process figure reused by every plot_* function; see _figure()
+_FIGURE = None
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Columns of the analyzed DataFrame that the diagrams actually use
+ANALYSIS_COLUMNS = ['timestamp', 'datetime', 'hour', 'day_of_week',
+                    'outcome_normalized', 'price', 'usdcSize', 'slug']
+
+def count_transitions(slug_codes, outcome_codes):
+    """Count consecutive (from, to) outcome pairs within each market.
+    
+    Both arrays must be sorted by market then timestamp. Returns a 2x2
+    matrix indexed by the outcome codes of the previous and current trade.
+    """
+    same_market = slug_codes[1:] == slug_codes[:-1]
+    pair_codes = outcome_codes[:-1].astype(np.int64) * 2 + outcome_codes[1:]
+    return np.bincount(pair_codes[same_market], minlength=4).reshape(2, 2)
+
+if njit is not None:
+    @njit(cache=True)
+    def count_transitions(slug_codes, outcome_codes):
+        counts = np.zeros((2, 2), np.int64)
+        for i in range(1, slug_codes.size):
+            if slug_codes[i] == slug_codes[i - 1]:
+                counts[outcome_codes[i - 1], outcome_codes[i]] += 1
+        return counts
+
 def load_all_trades(directory):
-    """Load all trade data from JSON files."""
-    all_trades = []
-    files_processed = 0
-    
-    trade_dir = Path(directory)
-    for json_file in trade_dir.glob("*.json"):
-        # Skip firsttimestamp.json as it has different structure
-        if json_file.name == "firsttimestamp.json":
-            continue
-            
-        try:
-            with open(json_file, 'r') as f:
-                data = json.load(f)
-                # Handle both array and object formats
-                if isinstance(data, list):
-                    trades = data
-                elif isinstance(data, dict):
-                    # Skip if it's the firsttimestamp structure
-                    continue
-                else:
-                    continue
-                
-                # Filter for BUY transactions only
-                buy_trades = [t for t in trades if t.get('side') == 'BUY']
-                all_trades.extend(buy_trades)
-                files_processed += 1
-        except Exception as e:
-            print(f"Error processing {json_file.name}: {e}")
-            continue
+    """Load all trade data from JSON files as a dict of column arrays."""
+    # Skip firsttimestamp.json as it has different structure
+    files = sorted(p for p in Path(directory).glob("*.json") if p.name != "firsttimestamp.json")
+    
+    # Files are independent, so parse them across worker processes
+    columns, files_processed = read_all_buys(files)
+    
+    trades = {
+        'timestamp': np.frombuffer(columns['timestamp'], dtype=np.int64),
+        'outcome': np.asarray(columns['outcome'], dtype=object),
+        'price': np.frombuffer(columns['price'], dtype=np.float64),
+        'usdcSize': np.frombuffer(columns['usdcSize'], dtype=np.float64),
+        'slug': np.asarray(columns['slug'], dtype=object),
+    }
     
     print(f"Processed {files_processed} files")
-    print(f"Total BUY transactions: {len(all_trades)}")
-    return all_trades
+    print(f"Total BUY transactions: {len(trades['timestamp'])}")
+    return trades
 
 def analyze_patterns(trades):
     """Analyze buying patterns."""
-    # Convert to DataFrame for easier analysis
-    df = pd.DataFrame(trades)
+    # Wrap the column arrays directly instead of going through row records
+    df = pd.DataFrame(trades, copy=False)
+    
+    # Plot-grade precision is plenty; halve the bytes every kernel touches
+    df['price'] = df['price'].astype(np.float32)
+    df['usdcSize'] = df['usdcSize'].astype(np.float32)
     
     # Convert timestamp to datetime
     df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-    df['date'] = df['datetime'].dt.date
-    df['hour'] = df['datetime'].dt.hour
-    df['day_of_week'] = df['datetime'].dt.day_name()
+    df['hour'] = df['datetime'].dt.hour.astype(np.int8)
+    df['day_of_week'] = pd.Categorical(df['datetime'].dt.day_name(), categories=DAY_ORDER)
     
-    # Normalize outcome (Up/Down)
-    df['outcome_normalized'] = df['outcome'].str.strip().str.title()
+    # Normalize outcome (Up/Down) into a two-category column; anything
+    # else becomes NaN and is dropped below. The column only holds a handful
+    # of distinct spellings, so normalize those once and map every row.
+    outcome_map = {v: v.strip().title() for v in df['outcome'].unique() if isinstance(v, str)}
+    df['outcome_normalized'] = pd.Categorical(
+        df['outcome'].map(outcome_map), categories=['Up', 'Down'])
+    
+    df['slug'] = df['slug'].astype('category')
     
     # Filter to only Up/Down
-    df = df[df['outcome_normalized'].isin(['Up', 'Down'])]
+    df = df[df['outcome_normalized'].notna()]
     
     print(f"\nTotal Up/Down BUY transactions: {len(df)}")
     print(f"Up transactions: {len(df[df['outcome_normalized'] == 'Up'])}")
     print(f"Down transactions: {len(df[df['outcome_normalized'] == 'Down'])}")
     
-    return df
+    # Keep only what create_diagrams reads so later passes touch less memory
+    return df[ANALYSIS_COLUMNS].copy()
 
-def create_diagrams(df, output_dir):
-    """Create multiple analysis diagrams."""
-    output_path = Path(output_dir)
-    output_path.mkdir(exist_ok=True)
+def patterns_cache_path(directory):
+    """Return the Parquet cache path of the analyzed trades of directory.
     
-    # 1. Overall Distribution: Up vs Down
-    fig, ax = plt.subplots(figsize=(10, 6))
-    outcome_counts = df['outcome_normalized'].value_counts()
+    Keyed on this script's source as well, since the cache holds
+    analyze_patterns output rather than raw trades.
+    """
+    return cache_path_for(directory, prefix=".trade_cache", source=__file__)
+
+def _figure(width, height):
+    """Return this process's reusable figure, cleared and resized."""
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = plt.figure()
+    _FIGURE.clear()
+    _FIGURE.set_size_inches(width, height)
+    return _FIGURE
+
+def plot_overall_distribution(outcome_counts, output_file):
+    """1. Overall Distribution: Up vs Down"""
+    fig = _figure(10, 6)
+    ax = fig.subplots()
     colors = ['#2ecc71', '#e74c3c']  # Green for Up, Red for Down
     bars = ax.bar(outcome_counts.index, outcome_counts.values, color=colors, alpha=0.7, edgecolor='black')
     ax.set_title('Overall Distribution: Up vs Down BUY Transactions', fontsize=16, fontweight='bold')
@@ -99,61 +143,39 @@ def create_diagrams(df, output_dir):
                 f'{int(height)}',
                 ha='center', va='bottom', fontsize=12, fontweight='bold')
     
-    plt.tight_layout()
-    plt.savefig(output_path / '1_overall_distribution.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 2. Volume Distribution (USDC Size)
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-    
-    up_trades = df[df['outcome_normalized'] == 'Up']
-    down_trades = df[df['outcome_normalized'] == 'Down']
-    
-    axes[0].hist(up_trades['usdcSize'], bins=50, color='#2ecc71', alpha=0.7, edgecolor='black')
-    axes[0].set_title('USDC Size Distribution - UP Buys', fontsize=14, fontweight='bold')
-    axes[0].set_xlabel('USDC Size', fontsize=12)
-    axes[0].set_ylabel('Frequency', fontsize=12)
-    axes[0].grid(axis='y', alpha=0.3)
-    
-    axes[1].hist(down_trades['usdcSize'], bins=50, color='#e74c3c', alpha=0.7, edgecolor='black')
-    axes[1].set_title('USDC Size Distribution - DOWN Buys', fontsize=14, fontweight='bold')
-    axes[1].set_xlabel('USDC Size', fontsize=12)
-    axes[1].set_ylabel('Frequency', fontsize=12)
-    axes[1].grid(axis='y', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig(output_path / '2_volume_distribution.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 3. Price Distribution
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-    
-    axes[0].hist(up_trades['price'], bins=50, color='#2ecc71', alpha=0.7, edgecolor='black')
-    axes[0].set_title('Price Distribution - UP Buys', fontsize=14, fontweight='bold')
-    axes[0].set_xlabel('Price', fontsize=12)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_histograms(edges, up_counts, down_counts, label, output_file):
+    """2./3. Up and Down histograms of one column on shared bin edges"""
+    fig = _figure(14, 6)
+    axes = fig.subplots(1, 2)
+    
+    axes[0].bar(edges[:-1], up_counts, width=np.diff(edges), align='edge',
+                color='#2ecc71', alpha=0.7, edgecolor='black')
+    axes[0].set_title(f'{label} Distribution - UP Buys', fontsize=14, fontweight='bold')
+    axes[0].set_xlabel(label, fontsize=12)
     axes[0].set_ylabel('Frequency', fontsize=12)
     axes[0].grid(axis='y', alpha=0.3)
     
-    axes[1].hist(down_trades['price'], bins=50, color='#e74c3c', alpha=0.7, edgecolor='black')
-    axes[1].set_title('Price Distribution - DOWN Buys', fontsize=14, fontweight='bold')
-    axes[1].set_xlabel('Price', fontsize=12)
+    axes[1].bar(edges[:-1], down_counts, width=np.diff(edges), align='edge',
+                color='#e74c3c', alpha=0.7, edgecolor='black')
+    axes[1].set_title(f'{label} Distribution - DOWN Buys', fontsize=14, fontweight='bold')
+    axes[1].set_xlabel(label, fontsize=12)
     axes[1].set_ylabel('Frequency', fontsize=12)
     axes[1].grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_path / '3_price_distribution.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 4. Temporal Patterns - Over Time
-    fig, ax = plt.subplots(figsize=(16, 6))
-    
-    df_sorted = df.sort_values('datetime')
-    df_sorted['cumulative_up'] = (df_sorted['outcome_normalized'] == 'Up').cumsum()
-    df_sorted['cumulative_down'] = (df_sorted['outcome_normalized'] == 'Down').cumsum()
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_cumulative(times, cumulative_up, cumulative_down, output_file):
+    """4. Temporal Patterns - Over Time"""
+    fig = _figure(16, 6)
+    ax = fig.subplots()
     
-    ax.plot(df_sorted['datetime'], df_sorted['cumulative_up'], 
+    ax.plot(times, cumulative_up, 
             label='Cumulative UP Buys', color='#2ecc71', linewidth=2)
-    ax.plot(df_sorted['datetime'], df_sorted['cumulative_down'], 
+    ax.plot(times, cumulative_down, 
             label='Cumulative DOWN Buys', color='#e74c3c', linewidth=2)
     
     ax.set_title('Cumulative BUY Transactions Over Time', fontsize=16, fontweight='bold')
@@ -163,24 +185,22 @@ def create_diagrams(df, output_dir):
     ax.grid(alpha=0.3)
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
     ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
-    plt.xticks(rotation=45)
-    
-    plt.tight_layout()
-    plt.savefig(output_path / '4_temporal_cumulative.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 5. Hourly Pattern
-    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.tick_params(axis='x', labelrotation=45)
     
-    hourly_up = df[df['outcome_normalized'] == 'Up'].groupby('hour').size()
-    hourly_down = df[df['outcome_normalized'] == 'Down'].groupby('hour').size()
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_hourly(hourly, output_file):
+    """5. Hourly Pattern"""
+    fig = _figure(14, 6)
+    ax = fig.subplots()
     
     x = np.arange(24)
     width = 0.35
     
-    ax.bar(x - width/2, [hourly_up.get(h, 0) for h in x], width, 
+    ax.bar(x - width/2, hourly['Up'].values, width, 
            label='UP', color='#2ecc71', alpha=0.7, edgecolor='black')
-    ax.bar(x + width/2, [hourly_down.get(h, 0) for h in x], width, 
+    ax.bar(x + width/2, hourly['Down'].values, width, 
            label='DOWN', color='#e74c3c', alpha=0.7, edgecolor='black')
     
     ax.set_title('BUY Transactions by Hour of Day', fontsize=16, fontweight='bold')
@@ -190,59 +210,35 @@ def create_diagrams(df, output_dir):
     ax.legend(fontsize=12)
     ax.grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_path / '5_hourly_pattern.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 6. Day of Week Pattern
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    day_up = df[df['outcome_normalized'] == 'Up'].groupby('day_of_week').size().reindex(day_order, fill_value=0)
-    day_down = df[df['outcome_normalized'] == 'Down'].groupby('day_of_week').size().reindex(day_order, fill_value=0)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_day_of_week(day_counts, output_file):
+    """6. Day of Week Pattern"""
+    fig = _figure(12, 6)
+    ax = fig.subplots()
     
-    x = np.arange(len(day_order))
+    x = np.arange(len(DAY_ORDER))
     width = 0.35
     
-    ax.bar(x - width/2, day_up.values, width, label='UP', color='#2ecc71', alpha=0.7, edgecolor='black')
-    ax.bar(x + width/2, day_down.values, width, label='DOWN', color='#e74c3c', alpha=0.7, edgecolor='black')
+    ax.bar(x - width/2, day_counts['Up'].values, width, label='UP', color='#2ecc71', alpha=0.7, edgecolor='black')
+    ax.bar(x + width/2, day_counts['Down'].values, width, label='DOWN', color='#e74c3c', alpha=0.7, edgecolor='black')
     
     ax.set_title('BUY Transactions by Day of Week', fontsize=16, fontweight='bold')
     ax.set_xlabel('Day of Week', fontsize=12)
     ax.set_ylabel('Number of Transactions', fontsize=12)
     ax.set_xticks(x)
-    ax.set_xticklabels(day_order, rotation=45, ha='right')
+    ax.set_xticklabels(DAY_ORDER, rotation=45, ha='right')
     ax.legend(fontsize=12)
     ax.grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_path / '6_day_of_week_pattern.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 7. Sequential Pattern Analysis (Transitions)
-    fig, ax = plt.subplots(figsize=(12, 8))
-    
-    # Get sequential transitions
-    transitions = []
-    for market in df['slug'].unique():
-        market_trades = df[df['slug'] == market].sort_values('timestamp')
-        outcomes = market_trades['outcome_normalized'].tolist()
-        for i in range(len(outcomes) - 1):
-            transitions.append((outcomes[i], outcomes[i+1]))
-    
-    transition_counts = Counter(transitions)
-    
-    # Create transition matrix
-    transition_matrix = pd.DataFrame({
-        'From Up': [
-            transition_counts.get(('Up', 'Up'), 0),
-            transition_counts.get(('Down', 'Up'), 0)
-        ],
-        'From Down': [
-            transition_counts.get(('Up', 'Down'), 0),
-            transition_counts.get(('Down', 'Down'), 0)
-        ]
-    }, index=['To Up', 'To Down'])
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_transition_matrix(transition_matrix, output_file):
+    """7. Sequential Pattern Analysis (Transitions)"""
+    fig = _figure(12, 8)
+    ax = fig.subplots()
     
     sns.heatmap(transition_matrix, annot=True, fmt='d', cmap='RdYlGn', 
                 cbar_kws={'label': 'Count'}, ax=ax, linewidths=1, linecolor='black')
@@ -251,85 +247,144 @@ def create_diagrams(df, output_dir):
     ax.set_xlabel('From', fontsize=12)
     ax.set_ylabel('To', fontsize=12)
     
-    plt.tight_layout()
-    plt.savefig(output_path / '7_transition_matrix.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 8. Average Price by Outcome
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    avg_price_up = up_trades['price'].mean()
-    avg_price_down = down_trades['price'].mean()
-    std_price_up = up_trades['price'].std()
-    std_price_down = down_trades['price'].std()
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_average(means, stds, title, ylabel, value_format, output_file):
+    """8./9. Up vs Down average of one column, with std dev error bars"""
+    fig = _figure(10, 6)
+    ax = fig.subplots()
     
-    bars = ax.bar(['UP', 'DOWN'], [avg_price_up, avg_price_down], 
+    bars = ax.bar(['UP', 'DOWN'], means, 
                   color=['#2ecc71', '#e74c3c'], alpha=0.7, edgecolor='black',
-                  yerr=[std_price_up, std_price_down], capsize=10)
+                  yerr=stds, capsize=10)
     
-    ax.set_title('Average Price by Outcome (with Std Dev)', fontsize=16, fontweight='bold')
-    ax.set_ylabel('Average Price', fontsize=12)
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.set_ylabel(ylabel, fontsize=12)
     ax.set_xlabel('Outcome', fontsize=12)
     ax.grid(axis='y', alpha=0.3)
     
     # Add value labels
-    for i, bar in enumerate(bars):
+    for bar in bars:
         height = bar.get_height()
         ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'{height:.3f}',
+                value_format.format(height),
                 ha='center', va='bottom', fontsize=12, fontweight='bold')
     
-    plt.tight_layout()
-    plt.savefig(output_path / '8_average_price.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_scatter(up_price, up_size, down_price, down_size, output_file):
+    """10. Price vs Volume Scatter"""
+    fig = _figure(12, 8)
+    ax = fig.subplots()
+    
+    # No per-marker edges keeps Agg on its batched marker path; rasterize so
+    # vector outputs stay small too
+    ax.scatter(up_price, up_size, 
+              alpha=0.4, color='#2ecc71', label='UP', s=20, edgecolors='none', rasterized=True)
+    ax.scatter(down_price, down_size, 
+              alpha=0.4, color='#e74c3c', label='DOWN', s=20, edgecolors='none', rasterized=True)
+    
+    ax.set_title('Price vs Volume Scatter Plot', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Price', fontsize=12)
+    ax.set_ylabel('USDC Size', fontsize=12)
+    ax.legend(fontsize=12)
+    ax.grid(alpha=0.3)
+    
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def plot_summary_table(summary_df, output_file):
+    """11. Summary Statistics Table"""
+    fig = _figure(12, 8)
+    ax = fig.subplots()
+    ax.axis('tight')
+    ax.axis('off')
+    table = ax.table(cellText=summary_df.values, colLabels=summary_df.columns,
+                    cellLoc='center', loc='center', bbox=[0, 0, 1, 1])
+    table.auto_set_font_size(False)
+    table.set_fontsize(11)
+    table.scale(1, 2)
     
-    # 9. Average Volume by Outcome
-    fig, ax = plt.subplots(figsize=(10, 6))
+    # Style the header
+    for i in range(len(summary_df.columns)):
+        table[(0, i)].set_facecolor('#34495e')
+        table[(0, i)].set_text_props(weight='bold', color='white')
     
-    avg_volume_up = up_trades['usdcSize'].mean()
-    avg_volume_down = down_trades['usdcSize'].mean()
-    std_volume_up = up_trades['usdcSize'].std()
-    std_volume_down = down_trades['usdcSize'].std()
+    ax.set_title('Summary Statistics', fontsize=16, fontweight='bold', pad=20)
     
-    bars = ax.bar(['UP', 'DOWN'], [avg_volume_up, avg_volume_down], 
-                  color=['#2ecc71', '#e74c3c'], alpha=0.7, edgecolor='black',
-                  yerr=[std_volume_up, std_volume_down], capsize=10)
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight')
+
+def _run_plot(task):
+    """Worker entry point: call one plot function with its inputs."""
+    plot_fn, args = task
+    plot_fn(*args)
+
+def create_diagrams(df, output_dir, max_viz_points=200000):
+    """Create multiple analysis diagrams.
     
-    ax.set_title('Average Volume (USDC) by Outcome (with Std Dev)', fontsize=16, fontweight='bold')
-    ax.set_ylabel('Average USDC Size', fontsize=12)
-    ax.set_xlabel('Outcome', fontsize=12)
-    ax.grid(axis='y', alpha=0.3)
+    Aggregates always use the full DataFrame; the scatter plot draws at most
+    max_viz_points rows, sampled evenly from the Up and Down trades.
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(exist_ok=True)
     
-    # Add value labels
-    for i, bar in enumerate(bars):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'${height:.2f}',
-                ha='center', va='bottom', fontsize=12, fontweight='bold')
+    up_trades = df[df['outcome_normalized'] == 'Up']
+    down_trades = df[df['outcome_normalized'] == 'Down']
     
-    plt.tight_layout()
-    plt.savefig(output_path / '9_average_volume.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    # Per-outcome price/volume aggregates, computed in a single pass
+    stats = (df.groupby('outcome_normalized', observed=False)[['price', 'usdcSize']]
+             .agg(['mean', 'std', 'sum']))
     
-    # 10. Price vs Volume Scatter
-    fig, ax = plt.subplots(figsize=(12, 8))
+    outcome_counts = df['outcome_normalized'].value_counts(sort=False)
     
-    ax.scatter(up_trades['price'], up_trades['usdcSize'], 
-              alpha=0.5, color='#2ecc71', label='UP', s=50, edgecolors='black', linewidths=0.5)
-    ax.scatter(down_trades['price'], down_trades['usdcSize'], 
-              alpha=0.5, color='#e74c3c', label='DOWN', s=50, edgecolors='black', linewidths=0.5)
+    # Bin once with NumPy on shared edges so the Up and Down panels line up
+    histograms = {}
+    for col in ('usdcSize', 'price'):
+        edges = np.histogram_bin_edges(df[col].to_numpy(), bins=50)
+        up_counts, _ = np.histogram(up_trades[col].to_numpy(), edges)
+        down_counts, _ = np.histogram(down_trades[col].to_numpy(), edges)
+        histograms[col] = (edges, up_counts, down_counts)
     
-    ax.set_title('Price vs Volume Scatter Plot', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Price', fontsize=12)
-    ax.set_ylabel('USDC Size', fontsize=12)
-    ax.legend(fontsize=12)
-    ax.grid(alpha=0.3)
+    df_sorted = df.sort_values('datetime')
+    # Only Up/Down remain, so the Down running count is derived from the Up one
+    is_up = (df_sorted['outcome_normalized'].cat.codes.to_numpy() == 0).astype(np.int8)
+    cumulative_up = np.cumsum(is_up, dtype=np.int64)
+    cumulative_down = np.arange(1, len(cumulative_up) + 1, dtype=np.int64) - cumulative_up
+    
+    # One grouping pass yields the Up and Down counts for every hour
+    hourly = (df.groupby(['hour', 'outcome_normalized'], observed=True).size()
+              .unstack('outcome_normalized', fill_value=0)
+              .reindex(index=range(24), columns=['Up', 'Down'], fill_value=0))
+    
+    day_counts = (df.groupby(['day_of_week', 'outcome_normalized'], observed=True).size()
+                  .unstack('outcome_normalized', fill_value=0)
+                  .reindex(index=DAY_ORDER, columns=['Up', 'Down'], fill_value=0))
+    
+    # Get sequential transitions: one global sort, then count every trade
+    # against the previous trade of the same market
+    df_seq = df.sort_values(['slug', 'timestamp'])
+    transition_counts = count_transitions(
+        df_seq['slug'].cat.codes.to_numpy(),
+        df_seq['outcome_normalized'].cat.codes.to_numpy())
     
-    plt.tight_layout()
-    plt.savefig(output_path / '10_price_volume_scatter.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    # Create transition matrix
+    transition_matrix = pd.DataFrame(
+        transition_counts,
+        index=['To Up', 'To Down'],
+        columns=['From Up', 'From Down'])
+    
+    avg_price_up = stats.loc['Up', ('price', 'mean')]
+    avg_price_down = stats.loc['Down', ('price', 'mean')]
+    std_price_up = stats.loc['Up', ('price', 'std')]
+    std_price_down = stats.loc['Down', ('price', 'std')]
+    avg_volume_up = stats.loc['Up', ('usdcSize', 'mean')]
+    avg_volume_down = stats.loc['Down', ('usdcSize', 'mean')]
+    std_volume_up = stats.loc['Up', ('usdcSize', 'std')]
+    std_volume_down = stats.loc['Down', ('usdcSize', 'std')]
     
-    # 11. Summary Statistics Table
     summary_stats = {
         'Metric': [
             'Total Transactions',
@@ -354,49 +409,67 @@ def create_diagrams(df, output_dir):
             f"${avg_price_down:.4f}",
             f"${avg_volume_up:.2f}",
             f"${avg_volume_down:.2f}",
-            f"${up_trades['usdcSize'].sum():.2f}",
-            f"${down_trades['usdcSize'].sum():.2f}"
+            f"${stats.loc['Up', ('usdcSize', 'sum')]:.2f}",
+            f"${stats.loc['Down', ('usdcSize', 'sum')]:.2f}"
         ]
     }
-    
     summary_df = pd.DataFrame(summary_stats)
-    fig, ax = plt.subplots(figsize=(12, 8))
-    ax.axis('tight')
-    ax.axis('off')
-    table = ax.table(cellText=summary_df.values, colLabels=summary_df.columns,
-                    cellLoc='center', loc='center', bbox=[0, 0, 1, 1])
-    table.auto_set_font_size(False)
-    table.set_fontsize(11)
-    table.scale(1, 2)
     
-    # Style the header
-    for i in range(len(summary_df.columns)):
-        table[(0, i)].set_facecolor('#34495e')
-        table[(0, i)].set_text_props(weight='bold', color='white')
+    # Past a few hundred thousand points the scatter is a solid blob, so
+    # stratify-sample each outcome before shipping rows to the renderer
+    max_per_class = max_viz_points // 2
+    up_viz = up_trades.sample(min(len(up_trades), max_per_class), random_state=0)
+    down_viz = down_trades.sample(min(len(down_trades), max_per_class), random_state=0)
+    
+    # Every diagram only reads the small precomputed inputs above, so the
+    # rendering and PNG encoding run in parallel worker processes
+    tasks = [
+        (plot_overall_distribution, (outcome_counts, output_path / '1_overall_distribution.png')),
+        (plot_histograms, (*histograms['usdcSize'], 'USDC Size', output_path / '2_volume_distribution.png')),
+        (plot_histograms, (*histograms['price'], 'Price', output_path / '3_price_distribution.png')),
+        (plot_cumulative, (df_sorted['datetime'].to_numpy(), cumulative_up, cumulative_down,
+                           output_path / '4_temporal_cumulative.png')),
+        (plot_hourly, (hourly, output_path / '5_hourly_pattern.png')),
+        (plot_day_of_week, (day_counts, output_path / '6_day_of_week_pattern.png')),
+        (plot_transition_matrix, (transition_matrix, output_path / '7_transition_matrix.png')),
+        (plot_average, ([avg_price_up, avg_price_down], [std_price_up, std_price_down],
+                        'Average Price by Outcome (with Std Dev)', 'Average Price', '{:.3f}',
+                        output_path / '8_average_price.png')),
+        (plot_average, ([avg_volume_up, avg_volume_down], [std_volume_up, std_volume_down],
+                        'Average Volume (USDC) by Outcome (with Std Dev)', 'Average USDC Size', '${:.2f}',
+                        output_path / '9_average_volume.png')),
+        (plot_scatter, (up_viz['price'].to_numpy(), up_viz['usdcSize'].to_numpy(),
+                        down_viz['price'].to_numpy(), down_viz['usdcSize'].to_numpy(),
+                        output_path / '10_price_volume_scatter.png')),
+        (plot_summary_table, (summary_df, output_path / '11_summary_statistics.png')),
+    ]
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(_run_plot, tasks))
     
-    ax.set_title('Summary Statistics', fontsize=16, fontweight='bold', pad=20)
+    print(f"\nGenerated {len(list(output_path.glob('*.png')))} diagrams in {output_dir}/")
+
+def _load_and_analyze(trade_directory):
+    """Load and analyze the trades of trade_directory, or None if there are none."""
+    print("Loading trade data...")
+    trades = load_all_trades(trade_directory)
     
-    plt.tight_layout()
-    plt.savefig(output_path / '11_summary_statistics.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    if len(trades['timestamp']) == 0:
+        print("No trades found!")
+        return None
     
-    print(f"\nGenerated {len(list(output_path.glob('*.png')))} diagrams in {output_dir}/")
+    print("\nAnalyzing patterns...")
+    return analyze_patterns(trades)
 
 def main():
     """Main execution function."""
     trade_directory = "historical_trades"
     output_directory = "diagram"
     
-    print("Loading trade data...")
-    trades = load_all_trades(trade_directory)
-    
-    if not trades:
-        print("No trades found!")
+    df = load_cached(patterns_cache_path(trade_directory),
+                     lambda: _load_and_analyze(trade_directory))
+    if df is None:
         return
     
-    print("\nAnalyzing patterns...")
-    df = analyze_patterns(trades)
-    
     if len(df) == 0:
         print("No Up/Down transactions found!")
         return
@@ -4,66 +4,106 @@ Analyze buying patterns for each individual market separately.
 Creates diagrams for each market in diagram2 directory.
 """
 
-import json
+import hashlib
+import io
 import os
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import seaborn as sns
 import pandas as pd
 import numpy as np
+from summaries import compute_market_summary
+from trade_cache import load_or_build_cache
 
 # Set style
 sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (14, 8)
+matplotlib.rcParams['figure.figsize'] = (14, 8)
 
-def load_all_trades(directory):
-    """Load all trade data from JSON files."""
-    all_trades = []
-    files_processed = 0
-    
-    trade_dir = Path(directory)
-    for json_file in trade_dir.glob("*.json"):
-        # Skip firsttimestamp.json as it has different structure
-        if json_file.name == "firsttimestamp.json":
-            continue
-            
-        try:
-            with open(json_file, 'r') as f:
-                data = json.load(f)
-                # Handle both array and object formats
-                if isinstance(data, list):
-                    trades = data
-                elif isinstance(data, dict):
-                    # Skip if it's the firsttimestamp structure
-                    continue
-                else:
-                    continue
-                
-                # Filter for BUY transactions only
-                buy_trades = [t for t in trades if t.get('side') == 'BUY']
-                all_trades.extend(buy_trades)
-                files_processed += 1
-        except Exception as e:
-            print(f"Error processing {json_file.name}: {e}")
-            continue
-    
-    print(f"Processed {files_processed} files")
-    print(f"Total BUY transactions: {len(all_trades)}")
-    return all_trades
+# Figure size for each numbered diagram section
+FIGURE_SIZES = {
+    1: (10, 6),
+    2: (14, 6),
+    3: (14, 6),
+    4: (14, 6),
+    5: (12, 6),
+    6: (10, 8),
+    7: (10, 6),
+    8: (10, 6),
+    9: (12, 8),
+    10: (12, 8),
+}
 
-def create_market_diagrams(df, market_slug, output_dir):
-    """Create diagrams for a specific market."""
+# Per-process pool of reusable figures, one per section
+FIG_CACHE = {}
+
+def _init_figure_cache():
+    """Build this process's figure pool (used as the worker initializer)."""
+    FIG_CACHE.clear()
+    for section, figsize in FIGURE_SIZES.items():
+        FIG_CACHE[section] = Figure(figsize=figsize, layout='tight')
+
+def _figure(section):
+    """Return the cleared, reusable figure for a diagram section."""
+    if not FIG_CACHE:
+        _init_figure_cache()
+    fig = FIG_CACHE[section]
+    fig.clf()
+    return fig
+
+# Per-process thread that writes encoded PNGs while the next figure is drawn
+_PNG_WRITER = None
+
+def _save_png(fig, path, pending, dpi=120):
+    """Encode fig as PNG in memory and queue the file write on a background thread."""
+    global _PNG_WRITER
+    if _PNG_WRITER is None:
+        _PNG_WRITER = ThreadPoolExecutor(max_workers=1)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi, pil_kwargs={'compress_level': 1})
+    pending.append(_PNG_WRITER.submit(path.write_bytes, buf.getvalue()))
+
+def market_hash(df):
+    """Hash a market's trade data together with this script's source.
+
+    Diagrams only need regenerating when this changes.
+    """
+    h = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16)
+    h.update(df['timestamp'].to_numpy(np.int64).tobytes())
+    h.update(df['price'].to_numpy(np.float32).tobytes())
+    h.update(df['usdcSize'].to_numpy(np.float32).tobytes())
+    h.update(np.asarray(df['outcome_normalized'] == 'Up').tobytes())
+    return h.hexdigest()
+
+def create_market_diagrams(df, market_slug, output_dir, summary=None):
+    """Create diagrams for a specific market.
+    
+    summary is the market's entry from summaries.compute_market_summary;
+    it is computed from df when not given.
+    """
     output_path = Path(output_dir) / market_slug
     output_path.mkdir(parents=True, exist_ok=True)
     
-    # Normalize outcome (Up/Down)
-    df['outcome_normalized'] = df['outcome'].str.strip().str.title()
+    # Skip markets whose diagrams were built from the same data and code
+    hash_file = output_path / '.hash'
+    data_hash = market_hash(df)
+    if hash_file.exists() and hash_file.read_text() == data_hash:
+        print(f"  Diagrams for {market_slug} are up to date")
+        return
+    
+    # Background PNG writes still in flight for this market
+    pending = []
     
-    # Filter to only Up/Down
-    df = df[df['outcome_normalized'].isin(['Up', 'Down'])]
+    # main() normalizes outcome and filters to Up/Down once for all markets
+    unexpected = df.loc[~df['outcome_normalized'].isin(['Up', 'Down']), 'outcome_normalized']
+    if len(unexpected):
+        raise ValueError("create_market_diagrams expects outcome_normalized already filtered "
+                         f"to Up/Down, got {sorted(map(str, unexpected.unique()))}")
     
     if len(df) == 0:
         print(f"  No Up/Down transactions for {market_slug}")
@@ -75,12 +115,31 @@ def create_market_diagrams(df, market_slug, output_dir):
     df['hour'] = df['datetime'].dt.hour
     df['day_of_week'] = df['datetime'].dt.day_name()
     
-    up_trades = df[df['outcome_normalized'] == 'Up']
-    down_trades = df[df['outcome_normalized'] == 'Down']
+    # Split into Up/Down once and reuse the groups in every section
+    groups = df.groupby('outcome_normalized', sort=False, observed=True)
+    up_trades = groups.get_group('Up') if 'Up' in groups.groups else df.iloc[:0]
+    down_trades = groups.get_group('Down') if 'Down' in groups.groups else df.iloc[:0]
+    
+    # Per-outcome price/volume statistics shared by sections 7, 8 and 10
+    if summary is None:
+        summary = compute_market_summary(df)[market_slug]
+    avg_price_up = summary['up_mean_price']
+    avg_price_down = summary['down_mean_price']
+    std_price_up = summary['up_std_price']
+    std_price_down = summary['down_std_price']
+    avg_volume_up = summary['up_mean_volume']
+    avg_volume_down = summary['down_mean_volume']
+    std_volume_up = summary['up_std_volume']
+    std_volume_down = summary['down_std_volume']
+    total_volume_up = summary['up']
+    total_volume_down = summary['down']
     
     # 1. Overall Distribution: Up vs Down
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = _figure(1)
+    ax = fig.subplots()
+    # Categorical value_counts also lists outcomes with no trades; drop them
     outcome_counts = df['outcome_normalized'].value_counts()
+    outcome_counts = outcome_counts[outcome_counts > 0]
     colors = ['#2ecc71', '#e74c3c']  # Green for Up, Red for Down
     bars = ax.bar(outcome_counts.index, outcome_counts.values, color=colors, alpha=0.7, edgecolor='black')
     ax.set_title(f'Distribution: Up vs Down BUY Transactions\n{market_slug}', fontsize=14, fontweight='bold')
@@ -95,62 +154,75 @@ def create_market_diagrams(df, market_slug, output_dir):
                 f'{int(height)}',
                 ha='center', va='bottom', fontsize=12, fontweight='bold')
     
-    plt.tight_layout()
-    plt.savefig(output_path / '1_overall_distribution.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    _save_png(fig, output_path / '1_overall_distribution.png', pending)
     
     # 2. Volume Distribution (USDC Size)
     if len(up_trades) > 0 and len(down_trades) > 0:
-        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+        fig = _figure(2)
+        axes = fig.subplots(1, 2)
+        
+        # Bin in NumPy and draw the bars directly; both panels share a y range
+        up_counts, up_edges = np.histogram(up_trades['usdcSize'].values, bins=min(30, len(up_trades)))
+        down_counts, down_edges = np.histogram(down_trades['usdcSize'].values, bins=min(30, len(down_trades)))
+        ymax = max(up_counts.max(), down_counts.max()) * 1.05
         
-        axes[0].hist(up_trades['usdcSize'], bins=min(30, len(up_trades)), color='#2ecc71', alpha=0.7, edgecolor='black')
+        axes[0].bar(up_edges[:-1], up_counts, width=np.diff(up_edges), align='edge', color='#2ecc71', alpha=0.7, edgecolor='black')
         axes[0].set_title('USDC Size Distribution - UP Buys', fontsize=12, fontweight='bold')
         axes[0].set_xlabel('USDC Size', fontsize=10)
         axes[0].set_ylabel('Frequency', fontsize=10)
+        axes[0].set_ylim(0, ymax)
         axes[0].grid(axis='y', alpha=0.3)
         
-        axes[1].hist(down_trades['usdcSize'], bins=min(30, len(down_trades)), color='#e74c3c', alpha=0.7, edgecolor='black')
+        axes[1].bar(down_edges[:-1], down_counts, width=np.diff(down_edges), align='edge', color='#e74c3c', alpha=0.7, edgecolor='black')
         axes[1].set_title('USDC Size Distribution - DOWN Buys', fontsize=12, fontweight='bold')
         axes[1].set_xlabel('USDC Size', fontsize=10)
         axes[1].set_ylabel('Frequency', fontsize=10)
+        axes[1].set_ylim(0, ymax)
         axes[1].grid(axis='y', alpha=0.3)
         
-        plt.suptitle(f'{market_slug}', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(output_path / '2_volume_distribution.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.suptitle(f'{market_slug}', fontsize=14, fontweight='bold')
+        _save_png(fig, output_path / '2_volume_distribution.png', pending)
     
     # 3. Price Distribution
     if len(up_trades) > 0 and len(down_trades) > 0:
-        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+        fig = _figure(3)
+        axes = fig.subplots(1, 2)
         
-        axes[0].hist(up_trades['price'], bins=min(30, len(up_trades)), color='#2ecc71', alpha=0.7, edgecolor='black')
+        # Bin in NumPy and draw the bars directly; both panels share a y range
+        up_counts, up_edges = np.histogram(up_trades['price'].values, bins=min(30, len(up_trades)))
+        down_counts, down_edges = np.histogram(down_trades['price'].values, bins=min(30, len(down_trades)))
+        ymax = max(up_counts.max(), down_counts.max()) * 1.05
+        
+        axes[0].bar(up_edges[:-1], up_counts, width=np.diff(up_edges), align='edge', color='#2ecc71', alpha=0.7, edgecolor='black')
         axes[0].set_title('Price Distribution - UP Buys', fontsize=12, fontweight='bold')
         axes[0].set_xlabel('Price', fontsize=10)
         axes[0].set_ylabel('Frequency', fontsize=10)
+        axes[0].set_ylim(0, ymax)
         axes[0].grid(axis='y', alpha=0.3)
         
-        axes[1].hist(down_trades['price'], bins=min(30, len(down_trades)), color='#e74c3c', alpha=0.7, edgecolor='black')
+        axes[1].bar(down_edges[:-1], down_counts, width=np.diff(down_edges), align='edge', color='#e74c3c', alpha=0.7, edgecolor='black')
         axes[1].set_title('Price Distribution - DOWN Buys', fontsize=12, fontweight='bold')
         axes[1].set_xlabel('Price', fontsize=10)
         axes[1].set_ylabel('Frequency', fontsize=10)
+        axes[1].set_ylim(0, ymax)
         axes[1].grid(axis='y', alpha=0.3)
         
-        plt.suptitle(f'{market_slug}', fontsize=14, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(output_path / '3_price_distribution.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.suptitle(f'{market_slug}', fontsize=14, fontweight='bold')
+        _save_png(fig, output_path / '3_price_distribution.png', pending)
     
     # 4. Temporal Patterns - Over Time
-    fig, ax = plt.subplots(figsize=(14, 6))
+    fig = _figure(4)
+    ax = fig.subplots()
     
     df_sorted = df.sort_values('datetime')
-    df_sorted['cumulative_up'] = (df_sorted['outcome_normalized'] == 'Up').cumsum()
-    df_sorted['cumulative_down'] = (df_sorted['outcome_normalized'] == 'Down').cumsum()
+    times = df_sorted['datetime'].values
+    is_up = np.asarray(df_sorted['outcome_normalized'] == 'Up')
+    cum_up = np.cumsum(is_up, dtype=np.int32)
+    cum_down = np.cumsum(~is_up, dtype=np.int32)
     
-    ax.plot(df_sorted['datetime'], df_sorted['cumulative_up'], 
+    ax.plot(times, cum_up, 
             label='Cumulative UP Buys', color='#2ecc71', linewidth=2)
-    ax.plot(df_sorted['datetime'], df_sorted['cumulative_down'], 
+    ax.plot(times, cum_down, 
             label='Cumulative DOWN Buys', color='#e74c3c', linewidth=2)
     
     ax.set_title(f'Cumulative BUY Transactions Over Time\n{market_slug}', fontsize=14, fontweight='bold')
@@ -160,7 +232,7 @@ def create_market_diagrams(df, market_slug, output_dir):
     ax.grid(alpha=0.3)
     
     # Format x-axis based on time range
-    time_span = (df_sorted['datetime'].max() - df_sorted['datetime'].min()).total_seconds()
+    time_span = (times[-1] - times[0]) / np.timedelta64(1, 's')
     if time_span < 3600:  # Less than 1 hour
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
     elif time_span < 86400:  # Less than 1 day
@@ -168,24 +240,25 @@ def create_market_diagrams(df, market_slug, output_dir):
     else:
         ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d %H:%M'))
     
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(output_path / '4_temporal_cumulative.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.tick_params(axis='x', labelrotation=45)
+    _save_png(fig, output_path / '4_temporal_cumulative.png', pending)
     
     # 5. Hourly Pattern (if data spans multiple hours)
-    if df['hour'].nunique() > 1:
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        hourly_up = df[df['outcome_normalized'] == 'Up'].groupby('hour').size()
-        hourly_down = df[df['outcome_normalized'] == 'Down'].groupby('hour').size()
+    hour_values = df['hour'].to_numpy(np.intp)
+    is_up = np.asarray(df['outcome_normalized'] == 'Up')
+    hourly_up = np.bincount(hour_values[is_up], minlength=24)
+    hourly_down = np.bincount(hour_values[~is_up], minlength=24)
+    hours = np.flatnonzero(hourly_up + hourly_down)
+    
+    if len(hours) > 1:
+        fig = _figure(5)
+        ax = fig.subplots()
         
-        hours = sorted(df['hour'].unique())
         x = np.arange(len(hours))
         width = 0.35
         
-        up_counts = [hourly_up.get(h, 0) for h in hours]
-        down_counts = [hourly_down.get(h, 0) for h in hours]
+        up_counts = hourly_up[hours]
+        down_counts = hourly_down[hours]
         
         ax.bar(x - width/2, up_counts, width, 
                label='UP', color='#2ecc71', alpha=0.7, edgecolor='black')
@@ -200,32 +273,22 @@ def create_market_diagrams(df, market_slug, output_dir):
         ax.legend(fontsize=11)
         ax.grid(axis='y', alpha=0.3)
         
-        plt.tight_layout()
-        plt.savefig(output_path / '5_hourly_pattern.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        _save_png(fig, output_path / '5_hourly_pattern.png', pending)
     
     # 6. Sequential Pattern Analysis (Transitions)
     if len(df) > 1:
-        fig, ax = plt.subplots(figsize=(10, 8))
-        
-        # Get sequential transitions
-        transitions = []
-        outcomes = df.sort_values('timestamp')['outcome_normalized'].tolist()
-        for i in range(len(outcomes) - 1):
-            transitions.append((outcomes[i], outcomes[i+1]))
+        fig = _figure(6)
+        ax = fig.subplots()
         
-        transition_counts = Counter(transitions)
+        # Count sequential transitions as bigram codes: with Up=1 and
+        # Down=0, prev*2 + curr gives DD=0, DU=1, UD=2, UU=3
+        codes = (df.sort_values('timestamp')['outcome_normalized'].values == 'Up').astype(np.int8)
+        dd, du, ud, uu = np.bincount(codes[:-1] * 2 + codes[1:], minlength=4)
         
         # Create transition matrix
         transition_matrix = pd.DataFrame({
-            'From Up': [
-                transition_counts.get(('Up', 'Up'), 0),
-                transition_counts.get(('Down', 'Up'), 0)
-            ],
-            'From Down': [
-                transition_counts.get(('Up', 'Down'), 0),
-                transition_counts.get(('Down', 'Down'), 0)
-            ]
+            'From Up': [uu, du],
+            'From Down': [ud, dd]
         }, index=['To Up', 'To Down'])
         
         sns.heatmap(transition_matrix, annot=True, fmt='d', cmap='RdYlGn', 
@@ -235,18 +298,12 @@ def create_market_diagrams(df, market_slug, output_dir):
         ax.set_xlabel('From', fontsize=12)
         ax.set_ylabel('To', fontsize=12)
         
-        plt.tight_layout()
-        plt.savefig(output_path / '6_transition_matrix.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        _save_png(fig, output_path / '6_transition_matrix.png', pending)
     
     # 7. Average Price by Outcome
     if len(up_trades) > 0 and len(down_trades) > 0:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        avg_price_up = up_trades['price'].mean()
-        avg_price_down = down_trades['price'].mean()
-        std_price_up = up_trades['price'].std()
-        std_price_down = down_trades['price'].std()
+        fig = _figure(7)
+        ax = fig.subplots()
         
         bars = ax.bar(['UP', 'DOWN'], [avg_price_up, avg_price_down], 
                       color=['#2ecc71', '#e74c3c'], alpha=0.7, edgecolor='black',
@@ -264,18 +321,12 @@ def create_market_diagrams(df, market_slug, output_dir):
                     f'{height:.3f}',
                     ha='center', va='bottom', fontsize=11, fontweight='bold')
         
-        plt.tight_layout()
-        plt.savefig(output_path / '7_average_price.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        _save_png(fig, output_path / '7_average_price.png', pending)
     
     # 8. Average Volume by Outcome
     if len(up_trades) > 0 and len(down_trades) > 0:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        avg_volume_up = up_trades['usdcSize'].mean()
-        avg_volume_down = down_trades['usdcSize'].mean()
-        std_volume_up = up_trades['usdcSize'].std()
-        std_volume_down = down_trades['usdcSize'].std()
+        fig = _figure(8)
+        ax = fig.subplots()
         
         bars = ax.bar(['UP', 'DOWN'], [avg_volume_up, avg_volume_down], 
                       color=['#2ecc71', '#e74c3c'], alpha=0.7, edgecolor='black',
@@ -293,13 +344,12 @@ def create_market_diagrams(df, market_slug, output_dir):
                     f'${height:.2f}',
                     ha='center', va='bottom', fontsize=11, fontweight='bold')
         
-        plt.tight_layout()
-        plt.savefig(output_path / '8_average_volume.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        _save_png(fig, output_path / '8_average_volume.png', pending)
     
     # 9. Price vs Volume Scatter
     if len(up_trades) > 0 and len(down_trades) > 0:
-        fig, ax = plt.subplots(figsize=(12, 8))
+        fig = _figure(9)
+        ax = fig.subplots()
         
         ax.scatter(up_trades['price'], up_trades['usdcSize'], 
                   alpha=0.5, color='#2ecc71', label='UP', s=50, edgecolors='black', linewidths=0.5)
@@ -312,9 +362,7 @@ def create_market_diagrams(df, market_slug, output_dir):
         ax.legend(fontsize=11)
         ax.grid(alpha=0.3)
         
-        plt.tight_layout()
-        plt.savefig(output_path / '9_price_volume_scatter.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        _save_png(fig, output_path / '9_price_volume_scatter.png', pending)
     
     # 10. Summary Statistics Table
     summary_stats = {
@@ -337,17 +385,18 @@ def create_market_diagrams(df, market_slug, output_dir):
             len(down_trades),
             f"{len(up_trades)/len(df)*100:.2f}%" if len(df) > 0 else "0%",
             f"{len(down_trades)/len(df)*100:.2f}%" if len(df) > 0 else "0%",
-            f"${up_trades['price'].mean():.4f}" if len(up_trades) > 0 else "$0.0000",
-            f"${down_trades['price'].mean():.4f}" if len(down_trades) > 0 else "$0.0000",
-            f"${up_trades['usdcSize'].mean():.2f}" if len(up_trades) > 0 else "$0.00",
-            f"${down_trades['usdcSize'].mean():.2f}" if len(down_trades) > 0 else "$0.00",
-            f"${up_trades['usdcSize'].sum():.2f}" if len(up_trades) > 0 else "$0.00",
-            f"${down_trades['usdcSize'].sum():.2f}" if len(down_trades) > 0 else "$0.00"
+            f"${avg_price_up:.4f}" if len(up_trades) > 0 else "$0.0000",
+            f"${avg_price_down:.4f}" if len(down_trades) > 0 else "$0.0000",
+            f"${avg_volume_up:.2f}" if len(up_trades) > 0 else "$0.00",
+            f"${avg_volume_down:.2f}" if len(down_trades) > 0 else "$0.00",
+            f"${total_volume_up:.2f}" if len(up_trades) > 0 else "$0.00",
+            f"${total_volume_down:.2f}" if len(down_trades) > 0 else "$0.00"
         ]
     }
     
     summary_df = pd.DataFrame(summary_stats)
-    fig, ax = plt.subplots(figsize=(12, 8))
+    fig = _figure(10)
+    ax = fig.subplots()
     ax.axis('tight')
     ax.axis('off')
     table = ax.table(cellText=summary_df.values, colLabels=summary_df.columns,
@@ -363,9 +412,18 @@ def create_market_diagrams(df, market_slug, output_dir):
     
     ax.set_title(f'Summary Statistics\n{market_slug}', fontsize=14, fontweight='bold', pad=20)
     
-    plt.tight_layout()
-    plt.savefig(output_path / '10_summary_statistics.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    # Table text stays at a higher resolution so it remains crisp
+    _save_png(fig, output_path / '10_summary_statistics.png', pending, dpi=200)
+    
+    # The hash marks the market done, so only record it once every PNG is on disk
+    for write in pending:
+        write.result()
+    hash_file.write_text(data_hash)
+
+def _create_market_diagrams_task(task):
+    """Process-pool entry point: unpack a (market_df, market_slug, output_dir, summary) task."""
+    create_market_diagrams(*task)
+    return task[1]
 
 def main():
     """Main execution function."""
@@ -373,35 +431,45 @@ def main():
     output_directory = "diagram2"
     
     print("Loading trade data...")
-    trades = load_all_trades(trade_directory)
+    # BUY trades only, shared with analyze_pricesplit.py via the Parquet cache
+    df = load_or_build_cache(trade_directory)
     
-    if not trades:
+    if len(df) == 0:
         print("No trades found!")
         return
     
-    # Convert to DataFrame
-    df = pd.DataFrame(trades)
-    
-    # Filter for BUY transactions with Up/Down outcomes
-    df = df[df['side'] == 'BUY']
+    # Filter for Up/Down outcomes
     df['outcome_normalized'] = df['outcome'].str.strip().str.title()
-    df = df[df['outcome_normalized'].isin(['Up', 'Down'])]
     
-    # Group by market slug
-    markets = df['slug'].unique()
-    print(f"\nFound {len(markets)} unique markets")
+    # Per-market totals and statistics, the same ones analyze_pricesplit.py reports
+    summary = compute_market_summary(df)
+    
+    df = df[df['outcome_normalized'].isin(['Up', 'Down'])].copy()
+    
+    # Downcast numerics and store repeated strings as categories to cut
+    # memory and the bytes scanned by the per-market filters
+    df['usdcSize'] = df['usdcSize'].astype('float32')
+    df['price'] = df['price'].astype('float32')
+    df['slug'] = df['slug'].astype('category')
+    df['outcome_normalized'] = df['outcome_normalized'].astype('category')
+    
+    # Group by market slug; partitions the frame in a single pass
+    markets = df.groupby('slug', sort=True, observed=True)
+    print(f"\nFound {markets.ngroups} unique markets")
     
     # Create output directory
     Path(output_directory).mkdir(exist_ok=True)
     
-    # Process each market
-    for i, market_slug in enumerate(sorted(markets), 1):
-        print(f"\nProcessing market {i}/{len(markets)}: {market_slug}")
-        market_df = df[df['slug'] == market_slug].copy()
-        create_market_diagrams(market_df, market_slug, output_directory)
+    # Markets are independent, so render them in worker processes (each
+    # one imports this module and so runs on the Agg backend)
+    tasks = [(market_df, market_slug, output_directory, summary[market_slug])
+             for market_slug, market_df in markets]
+    with ProcessPoolExecutor(initializer=_init_figure_cache) as executor:
+        for i, market_slug in enumerate(executor.map(_create_market_diagrams_task, tasks, chunksize=1), 1):
+            print(f"\nProcessed market {i}/{markets.ngroups}: {market_slug}")
     
     print(f"\n\nAnalysis complete! Diagrams saved in {output_directory}/")
-    print(f"Processed {len(markets)} markets")
+    print(f"Processed {markets.ngroups} markets")
 
 if __name__ == "__main__":
     main()
@@ -4,68 +4,199 @@ Analyze historical trades and create a price split JSON showing spending
 across Up/Down positions for each market.
 """
 
+import argparse
+import importlib.util
 import json
+import math
 import os
+from array import array
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 
-def analyze_trades():
-    """Analyze all trade JSON files and create price split summary."""
+# This script does no plotting; numpy/pandas/numba/polars are imported only
+# by the engine that needs them, so the stdlib engine starts fast.
+ENGINES = ('auto', 'stdlib', 'pandas', 'numba', 'polars')
+
+# Below this much input the stdlib engine beats paying the import cost of
+# the vectorized ones
+AUTO_STDLIB_MAX_BYTES = 8 * 1024 * 1024
+
+# Outcome codes used by the accumulation engines
+OUTCOME_DOWN, OUTCOME_UP, OUTCOME_OTHER = 0, 1, -1
+
+def _read_all_buys(json_files):
+    """Parse json_files in worker processes into BUY trade columns.
+
+    Returns (slugs, outcome_codes, usdc_sizes); trades without a slug are
+    dropped and a missing usdcSize counts as 0.
+    """
+    from trade_cache import read_all_buys
     
-    historical_trades_dir = Path("historical_trades")
+    columns, _ = read_all_buys(json_files)
+    codes = {"up": OUTCOME_UP, "down": OUTCOME_DOWN}
+    slugs = []
+    outcome_codes = array('b')
+    usdc_sizes = array('d')
+    for slug, outcome, usdc_size in zip(columns['slug'], columns['outcome'], columns['usdcSize']):
+        if not slug:
+            continue
+        slugs.append(slug)
+        # Anything but Up/Down counts towards the total only
+        outcome_codes.append(codes.get((outcome or "").strip().lower(), OUTCOME_OTHER))
+        usdc_sizes.append(0.0 if math.isnan(usdc_size) else usdc_size)
+    return slugs, outcome_codes, usdc_sizes
+
+def _cached_buys(directory):
+    """Read the same columns as _read_all_buys from the shared Parquet cache."""
+    import numpy as np
+    from trade_cache import load_or_build_cache
     
-    # Dictionary to track spending per market
-    # Structure: {market_slug: {"up": total_up, "down": total_down, "total": total}}
+    trades = load_or_build_cache(directory)
+    trades = trades[trades['slug'].notna() & (trades['slug'] != "")]
+    outcome = trades['outcome'].str.strip().str.lower()
+    outcome_codes = np.select(
+        [outcome == "up", outcome == "down"], [OUTCOME_UP, OUTCOME_DOWN], OUTCOME_OTHER
+    ).astype(np.int8)
+    return (
+        trades['slug'].cat.remove_unused_categories(),
+        outcome_codes,
+        trades['usdcSize'].fillna(0.0).to_numpy(np.float64),
+    )
+
+def market_totals_stdlib(slugs, outcome_codes, usdc_sizes):
+    """Sum spending per market in plain Python.
+
+    Like the other market_totals_* engines, returns
+    {market_slug: {"up": total_up, "down": total_down, "total": total}}.
+    """
     market_data = defaultdict(lambda: {"up": 0.0, "down": 0.0, "total": 0.0})
+    for slug, outcome, usdc_size in zip(slugs, outcome_codes, usdc_sizes):
+        totals = market_data[slug]
+        if outcome == OUTCOME_UP:
+            totals["up"] += usdc_size
+        elif outcome == OUTCOME_DOWN:
+            totals["down"] += usdc_size
+        totals["total"] += usdc_size
+    return dict(market_data)
+
+def _trades_frame(slugs, outcome_codes, usdc_sizes):
+    import numpy as np
+    import pandas as pd
+    return pd.DataFrame({
+        'slug': pd.Categorical(slugs),
+        'outcome': np.frombuffer(outcome_codes, dtype=np.int8),
+        'usdcSize': np.frombuffer(usdc_sizes, dtype=np.float64),
+    })
+
+def market_totals_pandas(slugs, outcome_codes, usdc_sizes):
+    """Sum spending per market with the groupby/pivot in summaries.py."""
+    import pandas as pd
+    from summaries import compute_market_summary
     
-    # Overall totals
-    overall_totals = {"up": 0.0, "down": 0.0, "total": 0.0}
+    trades = _trades_frame(slugs, outcome_codes, usdc_sizes)
+    # Code -1 (any other outcome) becomes NaN and only counts towards total
+    trades['outcome_normalized'] = pd.Categorical.from_codes(
+        trades['outcome'], categories=['Down', 'Up'])
+    return compute_market_summary(trades)
+
+def _accumulate(slug_codes, outcome_codes, values, up, down, total):
+    for i in range(values.size):
+        slug = slug_codes[i]
+        if outcome_codes[i] == OUTCOME_UP:
+            up[slug] += values[i]
+        elif outcome_codes[i] == OUTCOME_DOWN:
+            down[slug] += values[i]
+        total[slug] += values[i]
+
+@lru_cache(maxsize=None)
+def _accumulate_kernel():
+    from numba import njit
+    return njit(cache=True)(_accumulate)
+
+def market_totals_numba(slugs, outcome_codes, usdc_sizes):
+    """Sum spending per market in a single compiled pass."""
+    import numpy as np
+    slug_index = _trades_frame(slugs, outcome_codes, usdc_sizes)['slug'].cat
+    up, down, total = (np.zeros(len(slug_index.categories)) for _ in range(3))
+    _accumulate_kernel()(
+        slug_index.codes.to_numpy(np.intp),
+        np.frombuffer(outcome_codes, dtype=np.int8),
+        np.frombuffer(usdc_sizes, dtype=np.float64),
+        up, down, total,
+    )
+    return {
+        slug: {"up": float(up[i]), "down": float(down[i]), "total": float(total[i])}
+        for i, slug in enumerate(slug_index.categories)
+    }
+
+def market_totals_polars(slugs, outcome_codes, usdc_sizes):
+    """Sum spending per market with a multi-threaded Polars query."""
+    import polars as pl
+    totals = (
+        pl.DataFrame({
+            'slug': slugs,
+            'outcome': pl.Series(outcome_codes, dtype=pl.Int8),
+            'usdcSize': pl.Series(usdc_sizes, dtype=pl.Float64),
+        }).lazy()
+        .group_by('slug')
+        .agg(
+            pl.col('usdcSize').filter(pl.col('outcome') == OUTCOME_UP).sum().alias('up'),
+            pl.col('usdcSize').filter(pl.col('outcome') == OUTCOME_DOWN).sum().alias('down'),
+            pl.col('usdcSize').sum().alias('total'),
+        )
+        .collect()
+    )
+    return {row.pop('slug'): row for row in totals.iter_rows(named=True)}
+
+def pick_engine(json_files):
+    """Resolve the 'auto' engine from the input size and what is installed."""
+    if sum(f.stat().st_size for f in json_files) < AUTO_STDLIB_MAX_BYTES:
+        return 'stdlib'
+    for engine in ('polars', 'numba'):
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    return 'pandas'
+
+def analyze_trades(engine='auto'):
+    """Analyze all trade JSON files and create price split summary.
+
+    engine selects how the per-market sums are computed; see ENGINES.
+    """
+    
+    historical_trades_dir = Path("historical_trades")
     
     # Get all JSON files
     json_files = sorted(historical_trades_dir.glob("*.json"))
     
     print(f"Found {len(json_files)} JSON files to process...")
     
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r') as f:
-                data = json.load(f)
-            
-            # Handle case where file might not be a list
-            if not isinstance(data, list):
-                print(f"Skipping {json_file.name}: not a list format")
-                continue
-            
-            for trade in data:
-                # Ensure trade is a dictionary
-                if not isinstance(trade, dict):
-                    continue
-                
-                # Only process BUY trades (spending money)
-                if trade.get("side") != "BUY":
-                    continue
-                
-                usdc_size = trade.get("usdcSize", 0.0)
-                outcome = trade.get("outcome", "").strip()
-                slug = trade.get("slug", "")
-                
-                if not slug:
-                    continue
-                
-                # Add to market totals
-                if outcome.lower() == "up":
-                    market_data[slug]["up"] += usdc_size
-                    overall_totals["up"] += usdc_size
-                elif outcome.lower() == "down":
-                    market_data[slug]["down"] += usdc_size
-                    overall_totals["down"] += usdc_size
-                
-                market_data[slug]["total"] += usdc_size
-                overall_totals["total"] += usdc_size
-                
-        except Exception as e:
-            print(f"Error processing {json_file.name}: {e}")
-            continue
+    if engine == 'auto':
+        engine = pick_engine(json_files)
+    
+    if engine == 'stdlib':
+        # Parse the JSON directly so this path never imports pandas
+        slugs, outcome_codes, usdc_sizes = _read_all_buys(json_files)
+    else:
+        slugs, outcome_codes, usdc_sizes = _cached_buys(historical_trades_dir)
+    
+    print(f"Aggregating with the {engine} engine...")
+    
+    # Spending per market
+    # Structure: {market_slug: {"up": total_up, "down": total_down, "total": total}}
+    market_totals = {
+        'stdlib': market_totals_stdlib,
+        'pandas': market_totals_pandas,
+        'numba': market_totals_numba,
+        'polars': market_totals_polars,
+    }[engine]
+    market_data = market_totals(slugs, outcome_codes, usdc_sizes)
+    
+    # Overall totals
+    overall_totals = {
+        key: sum(totals[key] for totals in market_data.values())
+        for key in ("up", "down", "total")
+    }
     
     # Create the output structure
     output = {
@@ -101,4 +232,7 @@ def analyze_trades():
     return output
 
 if __name__ == "__main__":
-    analyze_trades()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--engine", choices=ENGINES, default="auto",
+                        help="aggregation engine (default: auto, by input size)")
+    analyze_trades(parser.parse_args().engine)
@@ -5,15 +5,21 @@ Trains ML models to identify and predict trading patterns from historical data
 Includes sequential pattern recognition, time-series features, and pattern discovery
 """
 
+import hashlib
 import json
 import os
+import orjson
 import glob
 import numpy as np
 import pandas as pd
 from datetime import datetime
-from collections import defaultdict, Counter, deque
-from sklearn.model_selection import train_test_split, TimeSeriesSplit
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingClassifier, GradientBoostingRegressor
+from functools import lru_cache
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.model_selection import train_test_split
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, HistGradientBoostingClassifier, HistGradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler, LabelEncoder, MinMaxScaler
 from sklearn.cluster import KMeans, DBSCAN
 from sklearn.metrics import accuracy_score, classification_report, mean_squared_error, r2_score, silhouette_score
@@ -22,6 +28,282 @@ import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
+# Accuracy the logistic regression outcome model may give up against the best
+# tree ensemble and still be chosen for its much cheaper inference
+LINEAR_MODEL_MAX_ACCURACY_GAP = 0.02
+
+# Number of earlier trades per market the history features look back over
+HISTORY_WINDOW = 50
+
+# Outcome codes used by the compiled feature kernels
+OUTCOME_DOWN, OUTCOME_UP, OUTCOME_OTHER = 0, 1, -1
+
+_EPOCH = datetime(1970, 1, 1)
+
+@lru_cache(maxsize=None)
+def _njit():
+    """numba's njit, or None when numba is not installed.
+    
+    Imported on first use, so processes that never run a kernel, like the
+    one-trade scoring CLI, skip the numba import.
+    """
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional; the feature kernels fall back to NumPy/Python
+        return None
+    return njit
+
+def _local_datetimes(timestamps):
+    """Convert unix timestamps to naive local times, as datetime.fromtimestamp does."""
+    seconds = timestamps.to_numpy(dtype=np.int64)
+    # The UTC offset only changes on quarter-hour boundaries, so look it up
+    # once per quarter hour rather than once per trade
+    quarters, inverse = np.unique(seconds // 900 * 900, return_inverse=True)
+    offsets = np.array([(datetime.fromtimestamp(q) - _EPOCH).total_seconds() - q for q in quarters],
+                       dtype=np.int64)
+    return pd.Series(pd.to_datetime(seconds + offsets[inverse], unit='s'), index=timestamps.index)
+
+# Hour part of a market slug like "january-21-2am-et"
+_MARKET_HOUR_PATTERN = r'(?:^|-)(\d+)(am|pm)(?:et)?(?=-|$)'
+
+def _market_hours(slugs):
+    """Map each distinct market slug to its market hour (24h), defaulting to 12."""
+    slugs = slugs.drop_duplicates()
+    parts = slugs.str.lower().str.extract(_MARKET_HOUR_PATTERN)
+    hour = parts[0].astype(float)
+    hour = hour.where(~((parts[1] == 'pm') & (hour < 12)), hour + 12)
+    return dict(zip(slugs, hour.fillna(12).astype(np.int64)))
+
+def _basic_features(price, outcome_code, hour, day_of_week):
+    """Per-trade features that only need the trade itself.
+    
+    Returns (price_distance_from_50, is_cheaper_outcome, is_business_hours,
+    is_weekend). A trade buys the cheaper outcome when it buys Up below 0.5
+    or Down above 0.5.
+    """
+    is_cheaper = (((outcome_code == OUTCOME_UP) & (price < 0.5)) |
+                  ((outcome_code == OUTCOME_DOWN) & (price > 0.5)))
+    return (np.abs(price - 0.5), is_cheaper.astype(np.int8),
+            ((hour >= 9) & (hour <= 17)).astype(np.int8), (day_of_week >= 5).astype(np.int8))
+
+def _basic_features_loop(price, outcome_code, hour, day_of_week):
+    """_basic_features as a single loop, for compiling with numba."""
+    n = price.size
+    distance_from_50 = np.empty(n, np.float64)
+    is_cheaper = np.zeros(n, np.int8)
+    is_business_hours = np.zeros(n, np.int8)
+    is_weekend = np.zeros(n, np.int8)
+    for i in range(n):
+        distance_from_50[i] = abs(price[i] - 0.5)
+        if (outcome_code[i] == OUTCOME_UP and price[i] < 0.5) or \
+           (outcome_code[i] == OUTCOME_DOWN and price[i] > 0.5):
+            is_cheaper[i] = 1
+        if 9 <= hour[i] <= 17:
+            is_business_hours[i] = 1
+        if day_of_week[i] >= 5:
+            is_weekend[i] = 1
+    return distance_from_50, is_cheaper, is_business_hours, is_weekend
+
+@lru_cache(maxsize=None)
+def _basic_features_kernel():
+    njit = _njit()
+    return _basic_features if njit is None else njit(cache=True)(_basic_features_loop)
+
+def _outcome_history(market_codes, outcome_codes, n_markets):
+    """Outcome features from each market's previous two trades.
+    
+    Trades must be in time order within each market. Each market keeps its
+    recent outcome codes in a row of a preallocated ring buffer rather than
+    a per-market deque. Returns (last_outcome_code, outcome_switched); the
+    last outcome code is -2 when the market has fewer than two earlier
+    trades.
+    """
+    depth = 2
+    n = outcome_codes.size
+    last_outcome_code = np.full(n, -2, np.int64)
+    outcome_switched = np.zeros(n, np.int64)
+    recent = np.zeros((n_markets, depth), np.int64)
+    write_idx = np.zeros(n_markets, np.int64)
+    seen = np.zeros(n_markets, np.int64)
+    for i in range(n):
+        m = market_codes[i]
+        if seen[m] >= 2:
+            last = recent[m, (write_idx[m] + depth - 1) % depth]
+            before_last = recent[m, (write_idx[m] + depth - 2) % depth]
+            last_outcome_code[i] = last
+            if last != before_last:
+                outcome_switched[i] = 1
+        recent[m, write_idx[m]] = outcome_codes[i]
+        write_idx[m] = (write_idx[m] + 1) % depth
+        seen[m] += 1
+    return last_outcome_code, outcome_switched
+
+@lru_cache(maxsize=None)
+def _outcome_history_kernel():
+    njit = _njit()
+    return _outcome_history if njit is None else njit(cache=True)(_outcome_history)
+
+def _hour_counts(hours):
+    """Trades per hour of day for the hours that have any, indexed by hour."""
+    counts = pd.Series(np.bincount(hours.to_numpy(np.intp), minlength=24))
+    return counts[counts > 0]
+
+def _last_time_series_split(n_samples, n_splits=3):
+    """Indices of the last split TimeSeriesSplit(n_splits) would yield.
+    
+    That split trains on everything before the final n_samples // (n_splits + 1)
+    samples and tests on those, so the earlier splits need not be generated.
+    """
+    cut = n_samples - n_samples // (n_splits + 1)
+    return np.arange(cut), np.arange(cut, n_samples)
+
+def _price_side_counts(is_up, prices):
+    """Count Up/Down trades below, at and above a price of 0.5 in one pass.
+    
+    Returns a 2x3 array indexed by [is_up, bucket], where buckets 0, 1 and
+    2 are below, at and above 0.5.
+    """
+    key = is_up.astype(np.int64) * 3 + np.sign(prices - 0.5).astype(np.int64) + 1
+    return np.bincount(key, minlength=6).reshape(2, 3)
+
+def _forest_sum(X, roots, left, right, feature, threshold, missing_left, value, out):
+    """Add every tree's leaf value for each row of X to out, tree by tree."""
+    for i in range(X.shape[0]):
+        for t in range(roots.size):
+            node = roots[t]
+            while left[node] != -1:
+                x = X[i, feature[node]]
+                if np.isnan(x):
+                    go_left = missing_left[node]
+                else:
+                    go_left = x <= threshold[node]
+                node = left[node] if go_left else right[node]
+            for k in range(value.shape[1]):
+                out[i, k] += value[node, k]
+
+@lru_cache(maxsize=None)
+def _forest_sum_kernel():
+    # nogil so score_many's threads can traverse forests concurrently
+    return _njit()(cache=True, nogil=True)(_forest_sum)
+
+class _FlatForest:
+    """A fitted single-output random forest flattened into node arrays.
+    
+    predict_proba/predict walk all trees in one compiled loop instead of
+    one Python-dispatched tree at a time, with the same float32 inputs,
+    leaf values and summation order as scikit-learn, so the results match.
+    """
+    
+    def __init__(self, forest):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.roots = offsets[:-1].astype(np.intp)
+        
+        # Child indices shifted into the concatenated arrays; -1 marks a leaf
+        self.left = np.concatenate([np.where(tree.children_left == -1, -1, tree.children_left + offset)
+                                    for tree, offset in zip(trees, self.roots)]).astype(np.intp)
+        self.right = np.concatenate([np.where(tree.children_right == -1, -1, tree.children_right + offset)
+                                     for tree, offset in zip(trees, self.roots)]).astype(np.intp)
+        self.feature = np.concatenate([tree.feature for tree in trees]).astype(np.intp)
+        self.threshold = np.concatenate([tree.threshold for tree in trees])
+        self.missing_left = np.concatenate([
+            np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)), dtype=np.bool_)
+            for tree in trees])
+        
+        self.is_classifier = hasattr(forest, 'classes_')
+        if self.is_classifier:
+            # Each tree predicts its leaf's class fractions
+            values = []
+            for tree in trees:
+                counts = tree.value[:, 0, :]
+                normalizer = counts.sum(axis=1)
+                normalizer[normalizer == 0.0] = 1.0
+                values.append(counts / normalizer[:, None])
+            self.value = np.concatenate(values)
+        else:
+            self.value = np.concatenate([tree.value[:, 0, :1] for tree in trees])
+        self.value = np.ascontiguousarray(self.value, dtype=np.float64)
+    
+    def _mean_leaf_values(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        out = np.zeros((X.shape[0], self.value.shape[1]))
+        _forest_sum_kernel()(X, self.roots, self.left, self.right, self.feature, self.threshold,
+                    self.missing_left, self.value, out)
+        out /= self.roots.size
+        return out
+    
+    def predict_proba(self, X):
+        return self._mean_leaf_values(X)
+    
+    def predict(self, X):
+        return self._mean_leaf_values(X)[:, 0]
+
+def prediction_defaults(price, hour=12, **kwargs):
+    """Feature values for predicting a single trade with no market history.
+    
+    Shared by predict_outcome and predict_trade_size; features missing here
+    are 0. is_cheaper_outcome is left out because the two models default it
+    differently (predict_outcome derives it from price, the size model uses 0)
+    unless kwargs sets it.
+    """
+    defaults = {
+        'price_distance_from_50': abs(price - 0.5),
+        'day_of_week': 0,
+        'price_ma5': price,
+        'price_ma10': price,
+        'price_volatility': 0,
+        'price_range': 0,
+        'price_momentum': 0,
+        'price_change_pct': 0,
+        'price_diff_from_last': 0,
+        'price_change_direction': 0,
+        'volume_trend': 0,
+        'is_high_volume': 0,
+        'outcome_switched': 0,
+        'trade_sequence_num': 1,
+        'time_since_last_trade': 0,
+        'market_hour': hour,
+        'hours_until_market': 0,
+        'is_weekend': 0,
+        'is_business_hours': 1 if 9 <= hour <= 17 else 0,
+    }
+    defaults.update(kwargs)
+    return defaults
+
+def _load_trade_file(file_path):
+    """Load one trade file, tagging each trade with its market slug and file."""
+    try:
+        with open(file_path, 'rb') as f:
+            trades = orjson.loads(f.read())
+            if isinstance(trades, list):
+                # Add market slug from filename
+                slug = os.path.basename(file_path).replace('.json', '')
+                for trade in trades:
+                    trade['market_slug'] = slug
+                    trade['file_path'] = file_path
+                return trades
+    except Exception as e:
+        print(f"   ⚠️  Error loading {file_path}: {e}")
+    return []
+
+def _fit_and_score(model, X_train, y_train, X_test, y_test, metric):
+    """Fit one candidate model and score it on the held-out split."""
+    model.fit(X_train, y_train)
+    return model, metric(y_test, model.predict(X_test))
+
+def _fit_candidates(models, X_train, y_train, X_test, y_test, metric):
+    """Fit and score the candidate models concurrently, one worker per model.
+    
+    Returns [(fitted_model, score)] in the order of models. joblib limits
+    each loky worker's OpenMP/BLAS threads to its share of the cores, so
+    the concurrent fits do not oversubscribe them.
+    """
+    n_jobs = min(len(models), os.cpu_count() or 1)
+    return joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_fit_and_score)(model, X_train, y_train, X_test, y_test, metric)
+        for model in models.values()
+    )
+
 class TradingPatternModel:
     def __init__(self, data_dir='historical_trades'):
         self.data_dir = data_dir
@@ -31,26 +313,60 @@ class TradingPatternModel:
         self.feature_importance = {}
         self.patterns = {}
         self.clusters = None
+        # (frame, count) of the last outcome-switch count, shared by
+        # discover_patterns and analyze_patterns
+        self._switches = (None, None)
+        # Per model: (scaler, training feature columns, single-row buffer,
+        # float32 mean and scale); see _layout
+        self._feature_layouts = {}
+        # Per model: (fitted model, compiled predictor) from compile_predictors
+        self._predictors = {}
+        
+    def features_cache_path(self):
+        """Parquet path for the features of the current trade files.
+        
+        Keyed on every file's name, mtime and size and on this script's
+        source, so new trades or feature changes produce a new cache file.
+        """
+        h = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8)
+        for file_path in sorted(glob.glob(os.path.join(self.data_dir, '*.json'))):
+            stat = os.stat(file_path)
+            h.update(f"{os.path.basename(file_path)}:{stat.st_mtime}:{stat.st_size}".encode())
+        return Path(f".feature_cache_{h.hexdigest()}.parquet")
+    
+    def load_features(self):
+        """Load the feature DataFrame, from the Parquet cache when it is current.
+        
+        Otherwise loads the trades, extracts features and writes the cache.
+        Returns None when there is no trade data.
+        """
+        cache_path = self.features_cache_path()
+        if cache_path.exists():
+            print(f"📂 Loading cached features from {cache_path}...")
+            return pd.read_parquet(cache_path)
+        
+        trades = self.load_all_trades()
+        if len(trades) == 0:
+            return None
         
+        df = self.extract_features(trades)
+        try:
+            df.to_parquet(cache_path, compression='zstd')
+        except ImportError as e:
+            # No Parquet engine installed; run uncached
+            print(f"   ⚠️  Skipping feature cache: {e}")
+        return df
+    
     def load_all_trades(self):
         """Load all trade data from JSON files"""
         print("📂 Loading trade data...")
         all_trades = []
         files = sorted(glob.glob(os.path.join(self.data_dir, '*.json')))
         
-        for file_path in files:
-            try:
-                with open(file_path, 'r') as f:
-                    trades = json.load(f)
-                    if isinstance(trades, list):
-                        # Add market slug from filename
-                        slug = os.path.basename(file_path).replace('.json', '')
-                        for trade in trades:
-                            trade['market_slug'] = slug
-                            trade['file_path'] = file_path
-                        all_trades.extend(trades)
-            except Exception as e:
-                print(f"   ⚠️  Error loading {file_path}: {e}")
+        # Reads overlap across threads; results come back in file order
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for trades in executor.map(_load_trade_file, files):
+                all_trades.extend(trades)
         
         print(f"✅ Loaded {len(all_trades)} total trades from {len(files)} files")
         return all_trades
@@ -59,167 +375,146 @@ class TradingPatternModel:
         """Extract advanced features from trade data with time-series context"""
         print("\n🔍 Extracting advanced features...")
         
-        # Sort trades by timestamp for time-series features
-        trades_sorted = sorted(trades, key=lambda x: (x.get('market_slug', ''), x.get('timestamp', 0)))
-        
-        # Group by market slug for market-specific features
-        trades_by_market = defaultdict(list)
-        for trade in trades_sorted:
-            slug = trade.get('market_slug', '')
-            trades_by_market[slug].append(trade)
-        
-        features = []
-        market_history = defaultdict(lambda: {
-            'prices': deque(maxlen=50),
-            'sizes': deque(maxlen=50),
-            'outcomes': deque(maxlen=50),
-            'timestamps': deque(maxlen=50),
-            'last_price': None,
-            'price_changes': deque(maxlen=20),
-        })
-        
-        for trade in trades_sorted:
-            slug = trade.get('market_slug', '')
-            hist = market_history[slug]
-            
-            # Skip MERGE events for feature extraction (but keep for analysis)
-            if trade.get('type') == 'MERGE':
-                continue
-            
-            # Basic features
-            feature = {
-                'price': trade.get('price', 0),
-                'size': trade.get('size', 0),
-                'usdcSize': trade.get('usdcSize', 0),
-                'timestamp': trade.get('timestamp', 0),
-                'outcome': trade.get('outcome', ''),
-                'side': trade.get('side', ''),
-                'outcomeIndex': trade.get('outcomeIndex', -1),
-                'market_slug': slug,
-                'type': trade.get('type', 'TRADE'),
-            }
-            
-            # Temporal features
-            if feature['timestamp']:
-                dt = datetime.fromtimestamp(feature['timestamp'])
-                feature['hour'] = dt.hour
-                feature['day_of_week'] = dt.weekday()
-                feature['day_of_month'] = dt.day
-                feature['minute'] = dt.minute
-                feature['is_weekend'] = 1 if dt.weekday() >= 5 else 0
-                feature['is_business_hours'] = 1 if 9 <= dt.hour <= 17 else 0
-            
-            # Price-based features
-            price = feature['price']
-            feature['price_distance_from_50'] = abs(price - 0.5)
-            feature['is_cheaper_outcome'] = 1 if (feature['outcome'] == 'Up' and price < 0.5) or \
-                                                 (feature['outcome'] == 'Down' and price > 0.5) else 0
-            feature['price_category'] = 'low' if price < 0.4 else ('high' if price > 0.6 else 'mid')
-            
-            # Time-series features from market history
-            if len(hist['prices']) > 0:
-                recent_prices = list(hist['prices'])
-                recent_sizes = list(hist['sizes'])
-                
-                # Moving averages
-                feature['price_ma5'] = np.mean(recent_prices[-5:]) if len(recent_prices) >= 5 else price
-                feature['price_ma10'] = np.mean(recent_prices[-10:]) if len(recent_prices) >= 10 else price
-                feature['size_ma5'] = np.mean(recent_sizes[-5:]) if len(recent_sizes) >= 5 else feature['size']
-                
-                # Volatility
-                if len(recent_prices) >= 5:
-                    feature['price_volatility'] = np.std(recent_prices[-5:])
-                    feature['price_range'] = max(recent_prices[-5:]) - min(recent_prices[-5:])
-                else:
-                    feature['price_volatility'] = 0
-                    feature['price_range'] = 0
-                
-                # Price momentum
-                if len(recent_prices) >= 3:
-                    feature['price_momentum'] = recent_prices[-1] - recent_prices[-3]
-                    feature['price_change_pct'] = (recent_prices[-1] - recent_prices[-3]) / recent_prices[-3] if recent_prices[-3] > 0 else 0
-                else:
-                    feature['price_momentum'] = 0
-                    feature['price_change_pct'] = 0
-                
-                # Last price comparison
-                if hist['last_price'] is not None:
-                    feature['price_diff_from_last'] = price - hist['last_price']
-                    feature['price_change_direction'] = 1 if price > hist['last_price'] else (-1 if price < hist['last_price'] else 0)
-                else:
-                    feature['price_diff_from_last'] = 0
-                    feature['price_change_direction'] = 0
-                
-                # Volume features
-                feature['volume_trend'] = np.mean(recent_sizes[-3:]) - np.mean(recent_sizes[-6:-3]) if len(recent_sizes) >= 6 else 0
-                feature['is_high_volume'] = 1 if feature['size'] > np.percentile(recent_sizes, 75) else 0 if len(recent_sizes) > 0 else 0
-            else:
-                # Default values for first trade in market
-                feature['price_ma5'] = price
-                feature['price_ma10'] = price
-                feature['size_ma5'] = feature['size']
-                feature['price_volatility'] = 0
-                feature['price_range'] = 0
-                feature['price_momentum'] = 0
-                feature['price_change_pct'] = 0
-                feature['price_diff_from_last'] = 0
-                feature['price_change_direction'] = 0
-                feature['volume_trend'] = 0
-                feature['is_high_volume'] = 0
-            
-            # Sequential pattern features
-            if len(hist['outcomes']) >= 2:
-                last_outcomes = list(hist['outcomes'])[-2:]
-                feature['last_outcome'] = last_outcomes[-1] if last_outcomes else ''
-                feature['outcome_switched'] = 1 if len(last_outcomes) >= 2 and last_outcomes[-1] != last_outcomes[-2] else 0
-            else:
-                feature['last_outcome'] = ''
-                feature['outcome_switched'] = 0
-            
-            # Market context features
-            feature['trade_sequence_num'] = len(hist['prices'])
-            feature['time_since_first_trade'] = feature['timestamp'] - hist['timestamps'][0] if len(hist['timestamps']) > 0 else 0
-            feature['time_since_last_trade'] = feature['timestamp'] - hist['timestamps'][-1] if len(hist['timestamps']) > 0 else 0
-            
-            # Extract market hour from slug
-            slug_lower = slug.lower()
-            if 'am' in slug_lower or 'pm' in slug_lower:
-                # Try to extract hour from slug like "january-21-2am-et"
-                parts = slug_lower.split('-')
-                for part in parts:
-                    if 'am' in part or 'pm' in part:
-                        try:
-                            hour_str = part.replace('am', '').replace('pm', '').replace('et', '')
-                            market_hour = int(hour_str)
-                            if 'pm' in part and market_hour < 12:
-                                market_hour += 12
-                            feature['market_hour'] = market_hour
-                            break
-                        except:
-                            feature['market_hour'] = 12  # default
-                else:
-                    feature['market_hour'] = 12
-            else:
-                feature['market_hour'] = 12
-            
-            # Time until market resolution (if we can infer from slug)
-            feature['hours_until_market'] = abs(feature['hour'] - feature['market_hour'])
-            
-            features.append(feature)
-            
-            # Update history
-            hist['prices'].append(price)
-            hist['sizes'].append(feature['size'])
-            hist['outcomes'].append(feature['outcome'])
-            hist['timestamps'].append(feature['timestamp'])
-            hist['last_price'] = price
-            if len(hist['prices']) >= 2:
-                hist['price_changes'].append(hist['prices'][-1] - hist['prices'][-2])
-        
-        df = pd.DataFrame(features)
+        # Skip MERGE events for feature extraction (but keep for analysis)
+        trades = [trade for trade in trades if trade.get('type') != 'MERGE']
+        
+        # Gather each field into its own column rather than building a
+        # record-per-trade frame; repeated strings become categoricals
+        def column(name, default):
+            return [trade.get(name, default) for trade in trades]
+        
+        df = pd.DataFrame({
+            'price': np.array(column('price', 0), dtype=np.float64),
+            'size': np.array(column('size', 0), dtype=np.float64),
+            'usdcSize': np.array(column('usdcSize', 0), dtype=np.float64),
+            'timestamp': np.array(column('timestamp', 0), dtype=np.int64),
+            'outcome': pd.Categorical(column('outcome', '')),
+            'side': pd.Categorical(column('side', '')),
+            'outcomeIndex': np.array(column('outcomeIndex', -1), dtype=np.int64),
+            'market_slug': pd.Categorical(column('market_slug', '')),
+            'type': pd.Categorical(column('type', 'TRADE')),
+        }, copy=False)
+        
+        # Sort trades by timestamp for time-series features. Slug categories
+        # are in sorted order, so their codes sort like the slugs; lexsort
+        # is stable, keeping load order for equal timestamps.
+        order = np.lexsort((df['timestamp'].to_numpy(), df['market_slug'].cat.codes.to_numpy()))
+        df = df.take(order).reset_index(drop=True)
+        n = len(df)
+        
+        # Temporal features
+        dt = _local_datetimes(df['timestamp']).dt
+        df['hour'] = dt.hour.astype(np.int64)
+        df['day_of_week'] = dt.weekday.astype(np.int64)
+        df['day_of_month'] = dt.day.astype(np.int64)
+        df['minute'] = dt.minute.astype(np.int64)
+        
+        # Per-trade flags and price distance in one pass
+        price = df['price']
+        up_down_codes = np.select([df['outcome'] == 'Up', df['outcome'] == 'Down'],
+                                  [OUTCOME_UP, OUTCOME_DOWN], OUTCOME_OTHER).astype(np.int8)
+        distance_from_50, is_cheaper, is_business_hours, is_weekend = _basic_features_kernel()(
+            price.to_numpy(np.float64), up_down_codes,
+            df['hour'].to_numpy(np.int64), df['day_of_week'].to_numpy(np.int64))
+        df['is_weekend'] = is_weekend
+        df['is_business_hours'] = is_business_hours
+        
+        # Price-based features
+        df['price_distance_from_50'] = distance_from_50
+        df['is_cheaper_outcome'] = is_cheaper
+        df['price_category'] = np.where(price < 0.4, 'low', np.where(price > 0.6, 'high', 'mid'))
+        
+        # Time-series features from market history. Rows are grouped by
+        # market, so a window over the previous w rows stays inside the
+        # trade's own market whenever it has at least w earlier trades.
+        markets = df.groupby('market_slug', sort=False, observed=True)
+        position = markets.cumcount().to_numpy()
+        prev_price = price.shift(1)
+        prev_size = df['size'].shift(1)
+        
+        # Moving averages
+        df['price_ma5'] = np.where(position >= 5, prev_price.rolling(5).mean(), price)
+        df['price_ma10'] = np.where(position >= 10, prev_price.rolling(10).mean(), price)
+        df['size_ma5'] = np.where(position >= 5, prev_size.rolling(5).mean(), df['size'])
+        
+        # Volatility
+        last5 = prev_price.rolling(5)
+        df['price_volatility'] = np.where(position >= 5, last5.std(ddof=0), 0.0)
+        df['price_range'] = np.where(position >= 5, last5.max() - last5.min(), 0.0)
+        
+        # Price momentum
+        price_3_back = price.shift(3)
+        momentum = prev_price - price_3_back
+        df['price_momentum'] = np.where(position >= 3, momentum, 0.0)
+        df['price_change_pct'] = np.where((position >= 3) & (price_3_back > 0), momentum / price_3_back, 0.0)
+        
+        # Last price comparison
+        price_diff = np.where(position >= 1, price - prev_price, 0.0)
+        df['price_diff_from_last'] = price_diff
+        df['price_change_direction'] = np.sign(price_diff).astype(np.int64)
+        
+        # Volume features
+        last3_sizes = prev_size.rolling(3).mean()
+        df['volume_trend'] = np.where(position >= 6, last3_sizes - last3_sizes.shift(3), 0.0)
+        
+        # High volume: above the 75th percentile of the market's previous sizes
+        previous_sizes = markets['size'].shift(1)
+        size_q75 = (previous_sizes.groupby(df['market_slug'], sort=False, observed=True)
+                    .rolling(HISTORY_WINDOW, min_periods=1).quantile(0.75)
+                    .reset_index(level=0, drop=True))
+        df['is_high_volume'] = (df['size'] > size_q75).astype(np.int64)
+        
+        # Sequential pattern features
+        outcome_codes = df['outcome'].cat.codes.to_numpy(np.int64)
+        last_outcome_code, outcome_switched = _outcome_history_kernel()(
+            df['market_slug'].cat.codes.to_numpy(np.int64), outcome_codes,
+            len(df['market_slug'].cat.categories))
+        outcome_names = np.append(df['outcome'].cat.categories.to_numpy(object), ['', ''])
+        # Codes -2 (too little history) and -1 (missing outcome) index the trailing ''
+        df['last_outcome'] = outcome_names[last_outcome_code]
+        df['outcome_switched'] = outcome_switched
+        
+        # Market context features
+        df['trade_sequence_num'] = np.minimum(position, HISTORY_WINDOW)
+        # Measured from the oldest trade in the market's history window
+        timestamps = df['timestamp'].to_numpy()
+        first_in_window = np.arange(n) - np.minimum(position, HISTORY_WINDOW)
+        df['time_since_first_trade'] = timestamps - timestamps[first_in_window]
+        df['time_since_last_trade'] = np.where(position >= 1, df['timestamp'].diff(), 0).astype(np.int64)
+        
+        # Extract market hour from slug
+        df['market_hour'] = df['market_slug'].map(_market_hours(df['market_slug']))
+        
+        # Time until market resolution (if we can infer from slug)
+        df['hours_until_market'] = (df['hour'] - df['market_hour']).abs()
+        
+        # Remaining string features become categoricals like the raw ones
+        for col in ['price_category', 'last_outcome']:
+            df[col] = df[col].astype('category')
+        
+        # Narrow numeric columns to halve what training has to scan
+        for col in df.select_dtypes('float64').columns:
+            df[col] = df[col].astype(np.float32)
+        for col in df.select_dtypes('int64').columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
         print(f"✅ Extracted {len(df)} samples with {len(df.columns)} features")
         return df
     
+    def _outcome_switches(self, df, valid_df):
+        """Count outcome changes between consecutive valid trades in time order.
+        
+        Features are ordered by market, so this needs its own sort by
+        timestamp; discover_patterns and analyze_patterns filter df the same
+        way, so the sort is done once per frame.
+        """
+        source, count = self._switches
+        if source is not df:
+            valid_df_sorted = valid_df.sort_values('timestamp')
+            count = int((valid_df_sorted['outcome'] != valid_df_sorted['outcome'].shift()).sum())
+            self._switches = (df, count)
+        return count
+    
     def discover_patterns(self, df):
         """Discover trading patterns using clustering and statistical analysis"""
         print("\n🔎 Discovering Trading Patterns...")
@@ -232,15 +527,15 @@ class TradingPatternModel:
             return
         
         # Pattern 1: Price-based decision making
-        up_trades = valid_df[valid_df['outcome'] == 'Up']
-        down_trades = valid_df[valid_df['outcome'] == 'Down']
+        (down_below_50, _, down_above_50), (up_below_50, _, up_above_50) = _price_side_counts(
+            (valid_df['outcome'] == 'Up').to_numpy(), valid_df['price'].to_numpy())
         
         patterns = {
             'price_based': {
-                'buy_up_below_50': len(up_trades[up_trades['price'] < 0.5]),
-                'buy_up_above_50': len(up_trades[up_trades['price'] > 0.5]),
-                'buy_down_below_50': len(down_trades[down_trades['price'] < 0.5]),
-                'buy_down_above_50': len(down_trades[down_trades['price'] > 0.5]),
+                'buy_up_below_50': int(up_below_50),
+                'buy_up_above_50': int(up_above_50),
+                'buy_down_below_50': int(down_below_50),
+                'buy_down_above_50': int(down_above_50),
             },
             'time_based': {},
             'size_based': {},
@@ -248,7 +543,7 @@ class TradingPatternModel:
         }
         
         # Pattern 2: Time-based patterns
-        hour_dist = valid_df.groupby('hour').size().sort_values(ascending=False)
+        hour_dist = _hour_counts(valid_df['hour']).sort_values(ascending=False)
         patterns['time_based']['most_active_hours'] = hour_dist.head(10).to_dict()
         
         # Pattern 3: Size patterns
@@ -261,8 +556,7 @@ class TradingPatternModel:
         }
         
         # Pattern 4: Sequential patterns
-        valid_df_sorted = valid_df.sort_values('timestamp')
-        outcome_switches = (valid_df_sorted['outcome'] != valid_df_sorted['outcome'].shift()).sum()
+        outcome_switches = self._outcome_switches(df, valid_df)
         patterns['sequential']['outcome_switches'] = int(outcome_switches)
         patterns['sequential']['avg_trades_per_market'] = len(valid_df) / valid_df['market_slug'].nunique()
         
@@ -281,15 +575,19 @@ class TradingPatternModel:
                 kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
                 clusters = kmeans.fit_predict(cluster_features_scaled)
                 valid_df['cluster'] = clusters
+                outcome_codes = valid_df['outcome'].cat.codes.to_numpy()
+                outcome_names = valid_df['outcome'].cat.categories
                 
                 patterns['clusters'] = {}
                 for cluster_id in range(n_clusters):
                     cluster_data = valid_df[valid_df['cluster'] == cluster_id]
+                    # Most common outcome (ties go to the first category, as with mode())
+                    outcome_counts = np.bincount(outcome_codes[clusters == cluster_id], minlength=len(outcome_names))
                     patterns['clusters'][f'cluster_{cluster_id}'] = {
                         'count': int(len(cluster_data)),
                         'avg_price': float(cluster_data['price'].mean()),
                         'avg_size': float(cluster_data['usdcSize'].mean()),
-                        'preferred_outcome': cluster_data['outcome'].mode().iloc[0] if len(cluster_data['outcome'].mode()) > 0 else 'Unknown',
+                        'preferred_outcome': outcome_names[outcome_counts.argmax()] if outcome_counts.any() else 'Unknown',
                         'avg_hour': float(cluster_data['hour'].mean()),
                     }
         
@@ -332,41 +630,48 @@ class TradingPatternModel:
         self.label_encoders['outcome'] = le
         
         # Use time-series split for more realistic evaluation
-        tscv = TimeSeriesSplit(n_splits=3)
-        splits = list(tscv.split(X))
-        train_idx, test_idx = splits[-1]  # Use last split
+        train_idx, test_idx = _last_time_series_split(len(X))
         
         X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
         y_train, y_test = y_encoded[train_idx], y_encoded[test_idx]
         
-        # Scale features
+        # Scale features in float32, which StandardScaler preserves, so
+        # serving can feed float32 rows through the same arithmetic
         scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
+        X_train_scaled = scaler.fit_transform(X_train.astype(np.float32))
+        X_test_scaled = scaler.transform(X_test.astype(np.float32))
         self.scalers['outcome'] = scaler
         
         # Train multiple models and pick the best
         models_to_try = {
             'random_forest': RandomForestClassifier(n_estimators=200, max_depth=15, 
                                                      min_samples_split=5, random_state=42, n_jobs=-1),
-            'gradient_boosting': GradientBoostingClassifier(n_estimators=200, max_depth=5, 
-                                                             learning_rate=0.1, random_state=42),
+            'hist_gradient_boosting': HistGradientBoostingClassifier(max_iter=200, max_depth=8, learning_rate=0.1,
+                                                                     early_stopping=True, random_state=42),
+            'logistic_regression': LogisticRegression(C=1.0, class_weight='balanced', max_iter=1000),
         }
         
         best_model = None
         best_score = 0
         best_name = None
         
-        for name, model in models_to_try.items():
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
-            score = accuracy_score(y_test, y_pred)
-            
+        fitted = _fit_candidates(models_to_try, X_train_scaled, y_train, X_test_scaled, y_test, accuracy_score)
+        scores = {}
+        for name, (model, score) in zip(models_to_try, fitted):
+            scores[name] = float(score)
             if score > best_score:
                 best_score = score
                 best_model = model
                 best_name = name
         
+        # The linear model scores a trade with one dot product, so keep it
+        # whenever it is nearly as accurate as the best tree ensemble
+        linear_model, linear_score = fitted[list(models_to_try).index('logistic_regression')]
+        if best_score - linear_score < LINEAR_MODEL_MAX_ACCURACY_GAP:
+            best_model = linear_model
+            best_name = 'logistic_regression'
+        self.patterns['outcome_model'] = {'selected': best_name, 'accuracy': scores}
+        
         self.models['outcome'] = best_model
         
         # Evaluate
@@ -421,36 +726,32 @@ class TradingPatternModel:
         y = valid_df['usdcSize']
         
         # Use time-series split
-        tscv = TimeSeriesSplit(n_splits=3)
-        splits = list(tscv.split(X))
-        train_idx, test_idx = splits[-1]
+        train_idx, test_idx = _last_time_series_split(len(X))
         
         X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
         y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
         
-        # Scale features
+        # Scale features in float32, which StandardScaler preserves, so
+        # serving can feed float32 rows through the same arithmetic
         scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
+        X_train_scaled = scaler.fit_transform(X_train.astype(np.float32))
+        X_test_scaled = scaler.transform(X_test.astype(np.float32))
         self.scalers['size'] = scaler
         
         # Train multiple models
         models_to_try = {
             'random_forest': RandomForestRegressor(n_estimators=200, max_depth=15,
                                                    min_samples_split=5, random_state=42, n_jobs=-1),
-            'gradient_boosting': GradientBoostingRegressor(n_estimators=200, max_depth=5,
-                                                           learning_rate=0.1, random_state=42),
+            'hist_gradient_boosting': HistGradientBoostingRegressor(max_iter=200, max_depth=8, learning_rate=0.1,
+                                                                    early_stopping=True, random_state=42),
         }
         
         best_model = None
         best_score = float('-inf')
         best_name = None
         
-        for name, model in models_to_try.items():
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
-            score = r2_score(y_test, y_pred)
-            
+        fitted = _fit_candidates(models_to_try, X_train_scaled, y_train, X_test_scaled, y_test, r2_score)
+        for name, (model, score) in zip(models_to_try, fitted):
             if score > best_score:
                 best_score = score
                 best_model = model
@@ -496,20 +797,19 @@ class TradingPatternModel:
             print("   ⚠️  No valid trades for analysis")
             return
         
-        up_trades = valid_df[valid_df['outcome'] == 'Up']
-        down_trades = valid_df[valid_df['outcome'] == 'Down']
+        is_up = (valid_df['outcome'] == 'Up').to_numpy()
+        prices = valid_df['price'].to_numpy()
         
         # Pattern 1: Price-based decision making
-        up_below_50 = len(up_trades[up_trades['price'] < 0.5])
-        up_above_50 = len(up_trades[up_trades['price'] > 0.5])
-        down_below_50 = len(down_trades[down_trades['price'] < 0.5])
-        down_above_50 = len(down_trades[down_trades['price'] > 0.5])
+        counts = _price_side_counts(is_up, prices)
+        (down_below_50, _, down_above_50), (up_below_50, _, up_above_50) = counts
+        n_down, n_up = counts.sum(axis=1)
         
         print(f"\n🎯 Price-Based Decision Pattern:")
-        print(f"   Buy Up when price < 0.5: {up_below_50} trades ({up_below_50/len(up_trades)*100:.1f}%)" if len(up_trades) > 0 else "   No Up trades")
-        print(f"   Buy Up when price > 0.5: {up_above_50} trades ({up_above_50/len(up_trades)*100:.1f}%)" if len(up_trades) > 0 else "   No Up trades")
-        print(f"   Buy Down when price < 0.5: {down_below_50} trades ({down_below_50/len(down_trades)*100:.1f}%)" if len(down_trades) > 0 else "   No Down trades")
-        print(f"   Buy Down when price > 0.5: {down_above_50} trades ({down_above_50/len(down_trades)*100:.1f}%)" if len(down_trades) > 0 else "   No Down trades")
+        print(f"   Buy Up when price < 0.5: {up_below_50} trades ({up_below_50/n_up*100:.1f}%)" if n_up > 0 else "   No Up trades")
+        print(f"   Buy Up when price > 0.5: {up_above_50} trades ({up_above_50/n_up*100:.1f}%)" if n_up > 0 else "   No Up trades")
+        print(f"   Buy Down when price < 0.5: {down_below_50} trades ({down_below_50/n_down*100:.1f}%)" if n_down > 0 else "   No Down trades")
+        print(f"   Buy Down when price > 0.5: {down_above_50} trades ({down_above_50/n_down*100:.1f}%)" if n_down > 0 else "   No Down trades")
         
         cheaper_trades = up_below_50 + down_above_50
         total_trades = len(valid_df)
@@ -517,7 +817,7 @@ class TradingPatternModel:
         
         # Pattern 2: Time-based patterns
         print(f"\n⏰ Time-Based Patterns:")
-        hour_dist = valid_df.groupby('hour').size().sort_values(ascending=False)
+        hour_dist = _hour_counts(valid_df['hour']).sort_values(ascending=False)
         print(f"   Most active hours:")
         for hour, count in hour_dist.head(5).items():
             print(f"      {hour:02d}:00 - {count} trades")
@@ -533,14 +833,13 @@ class TradingPatternModel:
         # Pattern 4: Price patterns
         print(f"\n💵 Price Patterns:")
         print(f"   Average price: ${valid_df['price'].mean():.4f}")
-        print(f"   Price when buying Up: ${up_trades['price'].mean():.4f}" if len(up_trades) > 0 else "   No Up trades")
-        print(f"   Price when buying Down: ${down_trades['price'].mean():.4f}" if len(down_trades) > 0 else "   No Down trades")
+        print(f"   Price when buying Up: ${prices[is_up].mean():.4f}" if n_up > 0 else "   No Up trades")
+        print(f"   Price when buying Down: ${prices[~is_up].mean():.4f}" if n_down > 0 else "   No Down trades")
         print(f"   Price volatility: ${valid_df['price'].std():.4f}")
         
         # Pattern 5: Sequential patterns
         print(f"\n🔄 Sequential Patterns:")
-        valid_df_sorted = valid_df.sort_values('timestamp')
-        outcome_switches = (valid_df_sorted['outcome'] != valid_df_sorted['outcome'].shift()).sum()
+        outcome_switches = self._outcome_switches(df, valid_df)
         print(f"   Outcome switches: {outcome_switches}")
         print(f"   Markets traded: {valid_df['market_slug'].nunique()}")
         print(f"   Avg trades per market: {len(valid_df) / valid_df['market_slug'].nunique():.1f}")
@@ -590,57 +889,127 @@ class TradingPatternModel:
                 json.dump(self.patterns, f, indent=2, default=str)
             print(f"💾 Saved discovered patterns to {patterns_path}")
     
-    def predict_outcome(self, price, hour=12, size=10, usdc_size=5, **kwargs):
-        """Predict which outcome to buy with advanced features"""
+    def _scale_batch(self, name, features):
+        """Scale rows for the `name` model.
+        
+        features is a DataFrame, whose columns are matched to the training
+        features by name (missing ones are 0), or an array already in
+        training column order. Rows are scaled and scored as float32.
+        """
+        scaler = self.scalers[name]
+        if isinstance(features, pd.DataFrame):
+            if hasattr(scaler, 'feature_names_in_'):
+                features = features.reindex(columns=scaler.feature_names_in_, fill_value=0)
+            features = features.to_numpy(np.float32)
+        else:
+            features = np.asarray(features, dtype=np.float32)
+        
+        layout = self._layout(name)
+        if layout[3] is None:
+            return scaler.transform(features)
+        # StandardScaler.transform's float32 arithmetic without its input validation
+        return (features - layout[3]) / layout[4]
+    
+    def _layout(self, name):
+        """(scaler, feature_cols, row_buffer, mean, scale) for the `name` model.
+        
+        Built once per fitted scaler. mean and scale are the float32 values a
+        StandardScaler subtracts and divides by (0 and 1 where centering or
+        scaling is off), or None for any other scaler.
+        """
+        scaler = self.scalers[name]
+        layout = self._feature_layouts.get(name)
+        if layout is None or layout[0] is not scaler:
+            feature_cols = tuple(scaler.feature_names_in_) if hasattr(scaler, 'feature_names_in_') else None
+            row = np.zeros((1, len(feature_cols)), dtype=np.float32) if feature_cols is not None else None
+            mean = scale = None
+            if isinstance(scaler, StandardScaler):
+                n_features = scaler.n_features_in_
+                mean = (scaler.mean_ if scaler.with_mean else np.zeros(n_features)).astype(np.float32)
+                scale = (scaler.scale_ if scaler.with_std else np.ones(n_features)).astype(np.float32)
+            layout = self._feature_layouts[name] = (scaler, feature_cols, row, mean, scale)
+        return layout
+    
+    def feature_layout(self, name):
+        """Return (feature_cols, row_buffer) for the `name` model.
+        
+        feature_cols is the scaler's training column order as a tuple, or
+        None if it was fit without column names. Both are built once per
+        fitted scaler; the buffer is refilled by every single-row prediction,
+        so predict_outcome and predict_trade_size are not thread-safe.
+        """
+        layout = self._layout(name)
+        return layout[1], layout[2]
+    
+    def compile_predictors(self):
+        """Serve the random forest models through the compiled _FlatForest.
+        
+        Needs numba; other model types, and forests fit on several outputs,
+        keep predicting through scikit-learn.
+        """
+        if _njit() is None:
+            return
+        for name, model in self.models.items():
+            if isinstance(model, (RandomForestClassifier, RandomForestRegressor)) and model.n_outputs_ == 1:
+                self._predictors[name] = (model, _FlatForest(model))
+    
+    def _predictor(self, name):
+        """The compiled predictor of the `name` model if it is current, else the model."""
+        model = self.models[name]
+        compiled = self._predictors.get(name)
+        return compiled[1] if compiled is not None and compiled[0] is model else model
+    
+    def predict_outcome_batch(self, features):
+        """Predict outcomes for many rows with one model call.
+        
+        Returns (predicted_outcomes, probabilities), with a probability
+        column per label encoder class.
+        """
+        if 'outcome' not in self.models:
+            return None
+        
+        probabilities = self._predictor('outcome').predict_proba(self._scale_batch('outcome', features))
+        outcomes = self.label_encoders['outcome'].classes_[probabilities.argmax(axis=1)]
+        return outcomes, probabilities
+    
+    def predict_trade_size_batch(self, features):
+        """Predict USDC trade sizes for many rows with one model call."""
+        if 'size' not in self.models:
+            return None
+        
+        return self._predictor('size').predict(self._scale_batch('size', features))
+    
+    def predict_outcome(self, price, hour=12, size=10, usdc_size=5, defaults=None, **kwargs):
+        """Predict which outcome to buy with advanced features
+        
+        defaults is a prediction_defaults dict to reuse, e.g. one shared with
+        predict_trade_size; it is built from price, hour and kwargs otherwise.
+        """
         if 'outcome' not in self.models:
             return None
         
         # Build feature vector with defaults
-        defaults = {
-            'price_distance_from_50': abs(price - 0.5),
-            'day_of_week': 0,
-            'is_cheaper_outcome': 1 if price < 0.5 else 0,
-            'price_ma5': price,
-            'price_ma10': price,
-            'price_volatility': 0,
-            'price_range': 0,
-            'price_momentum': 0,
-            'price_change_pct': 0,
-            'price_diff_from_last': 0,
-            'price_change_direction': 0,
-            'volume_trend': 0,
-            'is_high_volume': 0,
-            'outcome_switched': 0,
-            'trade_sequence_num': 1,
-            'time_since_last_trade': 0,
-            'market_hour': hour,
-            'hours_until_market': 0,
-            'is_weekend': 0,
-            'is_business_hours': 1 if 9 <= hour <= 17 else 0,
-        }
-        defaults.update(kwargs)
+        if defaults is None:
+            defaults = prediction_defaults(price, hour, **kwargs)
+        is_cheaper = defaults.get('is_cheaper_outcome', 1 if price < 0.5 else 0)
         
         # Get feature columns from scaler
-        feature_cols = self.scalers['outcome'].feature_names_in_ if hasattr(self.scalers['outcome'], 'feature_names_in_') else None
+        feature_cols, features = self.feature_layout('outcome')
         
         if feature_cols is None:
             # Fallback: use common features
             features = np.array([[
                 price, abs(price - 0.5), hour, defaults['day_of_week'],
-                size, usdc_size, defaults['is_cheaper_outcome']
-            ]])
+                size, usdc_size, is_cheaper
+            ]], dtype=np.float32)
         else:
-            # Build feature vector matching training features
-            feature_values = []
-            for col in feature_cols:
-                feature_values.append(defaults.get(col, 0))
-            features = np.array([feature_values])
-        
-        features_scaled = self.scalers['outcome'].transform(features)
-        prediction = self.models['outcome'].predict(features_scaled)[0]
-        outcome = self.label_encoders['outcome'].inverse_transform([prediction])[0]
+            # Fill the feature vector in training column order
+            for i, col in enumerate(feature_cols):
+                features[0, i] = is_cheaper if col == 'is_cheaper_outcome' else defaults.get(col, 0)
         
-        probabilities = self.models['outcome'].predict_proba(features_scaled)[0]
+        # One predict_proba pass; the outcome is its most probable class
+        outcomes, probabilities = self.predict_outcome_batch(features)
+        outcome, probabilities = outcomes[0], probabilities[0]
         prob_dict = dict(zip(self.label_encoders['outcome'].classes_, probabilities))
         
         return {
@@ -649,44 +1018,32 @@ class TradingPatternModel:
             'confidence': max(probabilities)
         }
     
-    def predict_trade_size(self, price, hour=12, outcome_index=0, **kwargs):
-        """Predict trade size with advanced features"""
+    def predict_trade_size(self, price, hour=12, outcome_index=0, defaults=None, **kwargs):
+        """Predict trade size with advanced features
+        
+        defaults is a prediction_defaults dict to reuse, as in predict_outcome.
+        """
         if 'size' not in self.models:
             return None
         
         is_cheaper = 1 if ((outcome_index == 0 and price < 0.5) or (outcome_index == 1 and price > 0.5)) else 0
         
-        defaults = {
-            'price_distance_from_50': abs(price - 0.5),
-            'day_of_week': 0,
-            'price_ma5': price,
-            'price_volatility': 0,
-            'price_momentum': 0,
-            'volume_trend': 0,
-            'trade_sequence_num': 1,
-            'time_since_last_trade': 0,
-            'market_hour': hour,
-            'is_weekend': 0,
-            'is_business_hours': 1 if 9 <= hour <= 17 else 0,
-        }
-        defaults.update(kwargs)
+        if defaults is None:
+            defaults = prediction_defaults(price, hour, **kwargs)
         
         # Get feature columns from scaler
-        feature_cols = self.scalers['size'].feature_names_in_ if hasattr(self.scalers['size'], 'feature_names_in_') else None
+        feature_cols, features = self.feature_layout('size')
         
         if feature_cols is None:
             features = np.array([[
                 price, abs(price - 0.5), hour, defaults['day_of_week'],
                 outcome_index, is_cheaper
-            ]])
+            ]], dtype=np.float32)
         else:
-            feature_values = []
-            for col in feature_cols:
-                feature_values.append(defaults.get(col, 0))
-            features = np.array([feature_values])
+            for i, col in enumerate(feature_cols):
+                features[0, i] = defaults.get(col, 0)
         
-        features_scaled = self.scalers['size'].transform(features)
-        predicted_size = self.models['size'].predict(features_scaled)[0]
+        predicted_size = self.predict_trade_size_batch(features)[0]
         
         return {
             'predicted_usdc_size': predicted_size,
@@ -700,16 +1057,13 @@ def main():
     # Initialize model
     model = TradingPatternModel('historical_trades')
     
-    # Load data
-    trades = model.load_all_trades()
+    # Load data and extract features (cached between runs)
+    df = model.load_features()
     
-    if len(trades) == 0:
+    if df is None:
         print("❌ No trade data found!")
         return
     
-    # Extract features
-    df = model.extract_features(trades)
-    
     # Analyze patterns
     model.analyze_patterns(df)
     
@@ -4,24 +4,223 @@ ML-Based Trading Algorithm
 Uses trained models to make trading decisions based on market conditions
 """
 
-import json
 import os
 import sys
+from functools import lru_cache
 import joblib
+import msgspec
 import numpy as np
+import orjson
+import pandas as pd
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
-from tradingPatternModel import TradingPatternModel
+from tradingPatternModel import TradingPatternModel, prediction_defaults
+
+# Decision thresholds
+MIN_CONFIDENCE = 0.85  # Require 85% confidence
+SKIP_BELOW_CONFIDENCE = 0.90  # Below this, not-cheaper or inactive-hour trades are skipped
+OVERRIDE_CONFIDENCE = 0.95  # Execute despite an outcome mismatch at this confidence
+MIN_SIZE = 1.0  # Minimum $1
+BALANCE_FRACTION = 0.95  # 5% safety buffer
+
+# Most active hours in the training data
+ACTIVE_HOURS = (3, 5, 8, 10, 23)
+# Bit h set for every active hour h
+_ACTIVE_HOUR_MASK = sum(1 << hour for hour in ACTIVE_HOURS)
+
+class MarketData(msgspec.Struct, gc=False):
+    """One trade to decide on; unknown keys in the request are ignored."""
+    price: float = 0.5
+    trader_side: str = 'BUY'
+    trader_outcome: Optional[str] = ''
+    trader_size: float = 0
+    trader_usdc_size: float = 0
+    timestamp: float = 0
+    market_slug: Optional[str] = None
+    available_balance: float = 0
+    current_position_size: float = 0
+
+_market_data_decoder = msgspec.json.Decoder(MarketData)
+
+def _as_market_data(market_data):
+    """market_data as a MarketData, converting a plain dict."""
+    if isinstance(market_data, MarketData):
+        return market_data
+    return msgspec.convert(market_data, MarketData)
+
+class Decision(NamedTuple):
+    """Outcome of should_execute_trade.
+    
+    The last three fields are only set for BUYs that reached the models;
+    _decision_dict leaves them out of the JSON otherwise.
+    """
+    execute: bool
+    reason: str
+    predicted_outcome: Optional[str]
+    confidence: float
+    recommended_size_usd: float
+    ml_confidence: float
+    is_cheaper_outcome: Optional[bool] = None
+    is_active_hour: Optional[bool] = None
+    outcome_match: Optional[bool] = None
+
+# Decision fields that are omitted from the JSON when unset
+_OPTIONAL_DECISION_FIELDS = ('is_cheaper_outcome', 'is_active_hour', 'outcome_match')
+
+def _decision_dict(decision):
+    """JSON-ready dict of a Decision, with the same keys the CLI has always printed."""
+    result = decision._asdict()
+    for field in _OPTIONAL_DECISION_FIELDS:
+        if result[field] is None:
+            del result[field]
+    return result
+
+# Bits of a decision's reason_code, one per rule that did not pass
+REASON_OUTCOME_MISMATCH = 1
+REASON_NOT_CHEAPER = 2
+REASON_INACTIVE_HOUR = 4
+REASON_SIZE_TOO_SMALL = 8
+REASON_SIZE_CAPPED = 16
+
+def _decide(ml_confidence, outcome_match, is_cheaper, is_active_hour, recommended_size, available_balance):
+    """Apply the decision rules to one scored trade.
+    
+    Returns (execute, recommended_size, reason_code), with the size zeroed
+    below MIN_SIZE or capped to the available balance.
+    """
+    reason_code = 0
+    if recommended_size < MIN_SIZE:
+        recommended_size = 0.0
+    
+    # Confident predictions and matching outcomes are executed...
+    execute = ml_confidence >= MIN_CONFIDENCE or outcome_match
+    if not outcome_match:
+        reason_code |= REASON_OUTCOME_MISMATCH
+    
+    # ...unless they are not the cheaper outcome or outside the active hours
+    # and the model is not confident enough to override that
+    confident = ml_confidence >= SKIP_BELOW_CONFIDENCE
+    if not is_cheaper:
+        reason_code |= REASON_NOT_CHEAPER
+        if not confident:
+            execute = False
+    if not is_active_hour:
+        reason_code |= REASON_INACTIVE_HOUR
+        if not confident:
+            execute = False
+    
+    # Size validation
+    if recommended_size < MIN_SIZE:
+        reason_code |= REASON_SIZE_TOO_SMALL
+        execute = False
+    elif recommended_size > available_balance * BALANCE_FRACTION:
+        recommended_size = available_balance * BALANCE_FRACTION
+        reason_code |= REASON_SIZE_CAPPED
+    
+    return execute, recommended_size, reason_code
+
+def _decision_reasons(reason_code, ml_confidence, trader_outcome, predicted_outcome, hour, recommended_size):
+    """Explain a decision as the ' | '-joined reasons should_execute_trade reports."""
+    reasons = []
+    
+    # High confidence ML prediction
+    if ml_confidence >= MIN_CONFIDENCE:
+        reasons.append(f'High ML confidence ({ml_confidence:.1%})')
+    
+    # Outcome matches prediction
+    if not reason_code & REASON_OUTCOME_MISMATCH:
+        reasons.append('Trader outcome matches ML prediction')
+    else:
+        reasons.append(f'Trader outcome ({trader_outcome}) differs from ML ({predicted_outcome})')
+        if ml_confidence >= OVERRIDE_CONFIDENCE:
+            reasons.append('Executing despite mismatch due to very high confidence')
+    
+    # Cheaper outcome preference
+    if not reason_code & REASON_NOT_CHEAPER:
+        reasons.append('Buying cheaper outcome (pattern match)')
+    else:
+        reasons.append('Not buying cheaper outcome')
+        if ml_confidence < SKIP_BELOW_CONFIDENCE:
+            reasons.append('Low confidence + not cheaper = skip')
+    
+    # Active hour bonus
+    if not reason_code & REASON_INACTIVE_HOUR:
+        reasons.append(f'Active trading hour ({hour}:00)')
+    else:
+        reasons.append(f'Less active hour ({hour}:00)')
+        if ml_confidence < SKIP_BELOW_CONFIDENCE:
+            reasons.append('Low confidence + inactive hour = skip')
+    
+    # Size validation
+    if reason_code & REASON_SIZE_TOO_SMALL:
+        reasons.append(f'Recommended size (${recommended_size:.2f}) below minimum (${MIN_SIZE})')
+    elif reason_code & REASON_SIZE_CAPPED:
+        reasons.append(f'Capped size to available balance')
+    
+    return ' | '.join(reasons)
+
+def _rejection_reason(price, trader_usdc_size, available_balance):
+    """Why a BUY can be rejected without scoring it, or None if it needs the models.
+    
+    Covers prices outside (0, 1), trades with no USDC size to copy and
+    balances that cannot fund the minimum trade after the safety buffer.
+    """
+    if price <= 0 or price >= 1:
+        return f'Invalid price: {price}'
+    if trader_usdc_size <= 0:
+        return f'Invalid trader size: ${trader_usdc_size:.2f}'
+    if available_balance * BALANCE_FRACTION < MIN_SIZE:
+        return f'Available balance (${available_balance:.2f}) below minimum trade size (${MIN_SIZE})'
+    return None
+
+def _time_features(market_data):
+    """(hour, day_of_week) of a trade's timestamp in local time, or of now if it has none."""
+    timestamp = market_data.timestamp
+    dt = datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
+    return dt.hour, dt.weekday()
+
+def _outcome_feature_frame(price, hour, day_of_week):
+    """Outcome model inputs for many trades, with predict_outcome's defaults.
+    
+    Training features not listed here are filled with 0 by
+    predict_outcome_batch, as predict_outcome does.
+    """
+    return pd.DataFrame({
+        'price_distance_from_50': np.abs(price - 0.5),
+        'day_of_week': day_of_week,
+        'is_cheaper_outcome': (price < 0.5).astype(np.int64),
+        'price_ma5': price,
+        'price_ma10': price,
+        'trade_sequence_num': 1,
+        'market_hour': hour,
+        'is_business_hours': ((hour >= 9) & (hour <= 17)).astype(np.int64),
+    })
+
+def _size_feature_frame(price, hour, day_of_week):
+    """Size model inputs for many trades, with predict_trade_size's defaults."""
+    return pd.DataFrame({
+        'price_distance_from_50': np.abs(price - 0.5),
+        'day_of_week': day_of_week,
+        'price_ma5': price,
+        'trade_sequence_num': 1,
+        'market_hour': hour,
+        'is_business_hours': ((hour >= 9) & (hour <= 17)).astype(np.int64),
+    })
 
 class MLTradingAlgorithm:
     def __init__(self, models_dir='models'):
         self.models_dir = models_dir
-        self.model = TradingPatternModel()
+        # Created by load_models, so instances that never load models skip it
+        self.model = None
         self.models_loaded = False
         self.patterns = None
+        # Forests are compiled by the first batch call, not by load_models
+        self._predictors_compiled = False
+        # Model outputs per distinct model input; see _score
+        self._cached_score = lru_cache(maxsize=8192)(self._score)
         
     def load_models(self):
         """Load trained models and patterns"""
@@ -41,30 +240,40 @@ class MLTradingAlgorithm:
                 print(f"Error: Model files not found in {self.models_dir}", file=sys.stderr)
                 return False
             
+            if self.model is None:
+                self.model = TradingPatternModel()
             self.model.models['outcome'] = joblib.load(outcome_model_path)
             self.model.models['size'] = joblib.load(size_model_path)
             self.model.scalers['outcome'] = joblib.load(outcome_scaler_path)
             self.model.scalers['size'] = joblib.load(size_scaler_path)
             self.model.label_encoders['outcome'] = joblib.load(outcome_encoder_path)
             
+            # Resolve the feature column order once, off the per-trade path
+            for name in ('outcome', 'size'):
+                self.model.feature_layout(name)
+            self._predictors_compiled = False
+            
             # Load patterns
             patterns_path = os.path.join(self.models_dir, 'discovered_patterns.json')
             if os.path.exists(patterns_path):
-                with open(patterns_path, 'r') as f:
-                    self.patterns = json.load(f)
+                with open(patterns_path, 'rb') as f:
+                    self.patterns = orjson.loads(f.read())
             
+            self._cached_score.cache_clear()
             self.models_loaded = True
             return True
         except Exception as e:
             print(f"Error loading models: {e}", file=sys.stderr)
             return False
     
-    def should_execute_trade(self, market_data: Dict) -> Dict:
+    def should_execute_trade(self, market_data: Union[Dict, MarketData],
+                             time_features: Optional[Tuple[int, int]] = None,
+                             explain: bool = False) -> Decision:
         """
         Main decision function: Should we execute this trade?
         
         Args:
-            market_data: Dictionary containing:
+            market_data: MarketData, or a dictionary with its fields:
                 - price: Current market price (0-1)
                 - trader_side: "BUY" or "SELL"
                 - trader_outcome: "Up" or "Down" (if buying)
@@ -74,9 +283,13 @@ class MLTradingAlgorithm:
                 - market_slug: Market identifier
                 - available_balance: Available USDC balance
                 - current_position_size: Current position size in USD (optional)
+            time_features: (hour, day_of_week) of the timestamp, if the caller
+                has already extracted them
+            explain: Whether to spell out the rules behind a scored trade in
+                reason; otherwise reason is empty for scored trades
         
         Returns:
-            Dictionary with:
+            Decision with:
                 - execute: bool - Whether to execute the trade
                 - reason: str - Reason for decision
                 - predicted_outcome: str - ML predicted outcome (if buying)
@@ -86,71 +299,69 @@ class MLTradingAlgorithm:
         """
         if not self.models_loaded:
             if not self.load_models():
-                return {
-                    'execute': False,
-                    'reason': 'Models not loaded',
-                    'predicted_outcome': None,
-                    'confidence': 0.0,
-                    'recommended_size_usd': 0.0,
-                    'ml_confidence': 0.0
-                }
-        
-        price = market_data.get('price', 0.5)
-        trader_side = market_data.get('trader_side', 'BUY')
-        trader_outcome = market_data.get('trader_outcome', '')
-        trader_usdc_size = market_data.get('trader_usdc_size', 0)
-        timestamp = market_data.get('timestamp', 0)
-        available_balance = market_data.get('available_balance', 0)
-        current_position_size = market_data.get('current_position_size', 0)
+                return Decision(
+                    execute=False,
+                    reason='Models not loaded',
+                    predicted_outcome=None,
+                    confidence=0.0,
+                    recommended_size_usd=0.0,
+                    ml_confidence=0.0
+                )
+        
+        market_data = _as_market_data(market_data)
+        price = market_data.price
+        trader_side = market_data.trader_side
+        trader_outcome = market_data.trader_outcome
+        trader_usdc_size = market_data.trader_usdc_size
+        available_balance = market_data.available_balance
         
         # Extract time features
-        dt = datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
-        hour = dt.hour
-        day_of_week = dt.weekday()
+        hour, day_of_week = time_features or _time_features(market_data)
         
         # Only process BUY orders (SELL/MERGE handled separately)
         if trader_side != 'BUY':
-            return {
-                'execute': True,  # Execute SELL/MERGE as-is
-                'reason': 'SELL/MERGE order - execute as-is',
-                'predicted_outcome': None,
-                'confidence': 1.0,
-                'recommended_size_usd': trader_usdc_size,
-                'ml_confidence': 1.0
-            }
-        
-        # Rule 1: Price validation
-        if price <= 0 or price >= 1:
-            return {
-                'execute': False,
-                'reason': f'Invalid price: {price}',
-                'predicted_outcome': None,
-                'confidence': 0.0,
-                'recommended_size_usd': 0.0,
-                'ml_confidence': 0.0
-            }
-        
-        # Rule 2: Use ML to predict outcome
-        outcome_prediction = self.model.predict_outcome(
-            price=price,
-            hour=hour,
-            size=market_data.get('trader_size', 0),
-            usdc_size=trader_usdc_size,
-            day_of_week=day_of_week
-        )
+            return Decision(
+                execute=True,  # Execute SELL/MERGE as-is
+                reason='SELL/MERGE order - execute as-is',
+                predicted_outcome=None,
+                confidence=1.0,
+                recommended_size_usd=trader_usdc_size,
+                ml_confidence=1.0
+            )
+        
+        # Rule 1: Price, size and balance validation, before any model call
+        rejection = _rejection_reason(price, trader_usdc_size, available_balance)
+        if rejection:
+            return Decision(
+                execute=False,
+                reason=rejection,
+                predicted_outcome=None,
+                confidence=0.0,
+                recommended_size_usd=0.0,
+                ml_confidence=0.0
+            )
+        
+        # Rule 2: Use ML to predict outcome (and, for Rule 7, the trade size).
+        # Models trained with feature names never read the trade's sizes, so
+        # those are left out of the cache key and repeats of the same price
+        # and time are answered from the cache
+        if self.model.feature_layout('outcome')[0] is not None:
+            scores = self._cached_score(price, hour, day_of_week)
+        else:
+            scores = self._cached_score(price, hour, day_of_week,
+                                        market_data.trader_size, trader_usdc_size)
         
-        if not outcome_prediction:
-            return {
-                'execute': False,
-                'reason': 'ML model prediction failed',
-                'predicted_outcome': None,
-                'confidence': 0.0,
-                'recommended_size_usd': 0.0,
-                'ml_confidence': 0.0
-            }
+        if scores is None:
+            return Decision(
+                execute=False,
+                reason='ML model prediction failed',
+                predicted_outcome=None,
+                confidence=0.0,
+                recommended_size_usd=0.0,
+                ml_confidence=0.0
+            )
         
-        predicted_outcome = outcome_prediction['predicted_outcome']
-        ml_confidence = outcome_prediction['confidence']
+        predicted_outcome, ml_confidence, predicted_usdc_size = scores
         
         # Rule 3: Check if trader's outcome matches ML prediction
         outcome_match = (trader_outcome == predicted_outcome) if trader_outcome else True
@@ -160,122 +371,197 @@ class MLTradingAlgorithm:
                      (predicted_outcome == 'Down' and price > 0.5)
         
         # Rule 5: Time-based filtering (most active hours: 10, 23, 8, 5, 3)
-        active_hours = [3, 5, 8, 10, 23]
-        is_active_hour = hour in active_hours
-        
-        # Rule 6: Confidence threshold
-        min_confidence = 0.85  # Require 85% confidence
+        is_active_hour = bool((_ACTIVE_HOUR_MASK >> hour) & 1)
         
         # Rule 7: Size validation using ML
-        outcome_index = 0 if predicted_outcome == 'Up' else 1
-        size_prediction = self.model.predict_trade_size(
-            price=price,
-            hour=hour,
-            outcome_index=outcome_index,
-            day_of_week=day_of_week
-        )
-        
-        if size_prediction:
-            recommended_size = size_prediction['predicted_usdc_size']
+        if predicted_usdc_size is not None:
             # Use average of trader size and ML prediction, but respect limits
-            recommended_size = (trader_usdc_size + recommended_size) / 2
+            recommended_size = (trader_usdc_size + predicted_usdc_size) / 2
         else:
             recommended_size = trader_usdc_size
         
-        # Apply safety limits
-        max_size = min(available_balance * 0.95, recommended_size)  # 5% safety buffer
-        min_size = 1.0  # Minimum $1
+        execute, recommended_size, reason_code = _decide(
+            ml_confidence, outcome_match, is_cheaper, is_active_hour,
+            float(recommended_size), float(available_balance)
+        )
+        reason = _decision_reasons(reason_code, ml_confidence, trader_outcome, predicted_outcome,
+                                   hour, recommended_size) if explain else ''
+        
+        return Decision(
+            execute=execute,
+            reason=reason,
+            predicted_outcome=predicted_outcome,
+            confidence=ml_confidence,
+            recommended_size_usd=max(0, recommended_size),
+            ml_confidence=ml_confidence,
+            is_cheaper_outcome=is_cheaper,
+            is_active_hour=is_active_hour,
+            outcome_match=outcome_match
+        )
+    
+    def _score(self, price, hour, day_of_week, size=0, usdc_size=0):
+        """
+        Model outputs for one BUY: (predicted_outcome, confidence, predicted_usdc_size)
         
-        if recommended_size < min_size:
-            recommended_size = 0
+        predicted_usdc_size is None without a size model; the result is None
+        if the outcome prediction failed. Pure in its arguments for a given
+        set of loaded models, which is what lets _cached_score memoize it.
+        """
+        # One defaults dict for both models
+        defaults = prediction_defaults(price, hour, day_of_week=day_of_week)
+        outcome_prediction = self.model.predict_outcome(
+            price=price,
+            hour=hour,
+            size=size,
+            usdc_size=usdc_size,
+            defaults=defaults
+        )
+        if not outcome_prediction:
+            return None
         
-        # Decision logic
-        execute = False
-        reasons = []
+        predicted_outcome = outcome_prediction['predicted_outcome']
+        size_prediction = self.model.predict_trade_size(
+            price=price,
+            hour=hour,
+            outcome_index=0 if predicted_outcome == 'Up' else 1,
+            defaults=defaults
+        )
+        predicted_usdc_size = size_prediction['predicted_usdc_size'] if size_prediction else None
+        return predicted_outcome, outcome_prediction['confidence'], predicted_usdc_size
+    
+    def _compile_predictors(self):
+        """Compile the loaded forests the first time a batch is scored."""
+        if not self._predictors_compiled:
+            # compile_predictors imports numba and flattens the trees, which
+            # only batches amortise; the one-trade CLI keeps predicting
+            # through scikit-learn and never loads numba
+            self.model.compile_predictors()
+            self._predictors_compiled = True
+    
+    def should_execute_trades_batch(self, market_data_list: List[Union[Dict, MarketData]],
+                                    explain: bool = False) -> List[Decision]:
+        """
+        Decide on many trades at once
         
-        # High confidence ML prediction
-        if ml_confidence >= min_confidence:
-            reasons.append(f'High ML confidence ({ml_confidence:.1%})')
-            execute = True
+        Gives the same decisions as calling should_execute_trade on each
+        item, but scores every BUY at a valid price with a single scaler and
+        model call per model and applies the rules as array operations.
+        """
+        if not self.models_loaded and not self.load_models():
+            return [self.should_execute_trade(market_data, explain=explain) for market_data in market_data_list]
+        if any(self.model.feature_layout(name)[0] is None for name in ('outcome', 'size')):
+            # Features can only be matched to the training columns by name
+            return [self.should_execute_trade(market_data, explain=explain) for market_data in market_data_list]
+        
+        self._compile_predictors()
+        
+        market_data_list = [_as_market_data(market_data) for market_data in market_data_list]
+        decisions = [None] * len(market_data_list)
+        scored = []
+        for i, market_data in enumerate(market_data_list):
+            if market_data.trader_side != 'BUY' or _rejection_reason(
+                    market_data.price, market_data.trader_usdc_size, market_data.available_balance):
+                # Rejected or passed through before any scoring
+                decisions[i] = self.should_execute_trade(market_data, explain=explain)
+            else:
+                scored.append(i)
+        if not scored:
+            return decisions
+        
+        rows = [market_data_list[i] for i in scored]
+        price = np.array([m.price for m in rows], dtype=np.float64)
+        trader_outcome = [m.trader_outcome for m in rows]
+        trader_usdc_size = np.array([m.trader_usdc_size for m in rows], dtype=np.float64)
+        available_balance = np.array([m.available_balance for m in rows], dtype=np.float64)
+        hour, day_of_week = np.array([_time_features(m) for m in rows], dtype=np.int64).reshape(-1, 2).T
+        
+        # One model call per model for every scored trade
+        predicted_outcome, probabilities = self.model.predict_outcome_batch(
+            _outcome_feature_frame(price, hour, day_of_week))
+        ml_confidence = probabilities.max(axis=1)
+        predicted_size = self.model.predict_trade_size_batch(_size_feature_frame(price, hour, day_of_week))
+        
+        outcome_match = np.array([outcome == predicted if outcome else True
+                                  for outcome, predicted in zip(trader_outcome, predicted_outcome)])
+        is_cheaper = (((predicted_outcome == 'Up') & (price < 0.5)) |
+                      ((predicted_outcome == 'Down') & (price > 0.5)))
+        is_active_hour = ((_ACTIVE_HOUR_MASK >> hour) & 1).astype(bool)
+        
+        recommended_size = (trader_usdc_size + predicted_size) / 2
+        recommended_size = np.where(recommended_size < MIN_SIZE, 0.0, recommended_size)
+        
+        # _decide's rules, for every trade at once
+        confident = ml_confidence >= SKIP_BELOW_CONFIDENCE
+        too_small = recommended_size < MIN_SIZE
+        execute = (((ml_confidence >= MIN_CONFIDENCE) | outcome_match) &
+                   (is_cheaper | confident) & (is_active_hour | confident) & ~too_small)
+        cap = available_balance * BALANCE_FRACTION
+        capped = ~too_small & (recommended_size > cap)
+        recommended_size = np.where(capped, cap, recommended_size)
+        reason_code = (np.where(outcome_match, 0, REASON_OUTCOME_MISMATCH) |
+                       np.where(is_cheaper, 0, REASON_NOT_CHEAPER) |
+                       np.where(is_active_hour, 0, REASON_INACTIVE_HOUR) |
+                       np.where(too_small, REASON_SIZE_TOO_SMALL, 0) |
+                       np.where(capped, REASON_SIZE_CAPPED, 0))
+        
+        for j, i in enumerate(scored):
+            decisions[i] = Decision(
+                execute=bool(execute[j]),
+                reason=_decision_reasons(reason_code[j], ml_confidence[j], trader_outcome[j],
+                                         predicted_outcome[j], hour[j], recommended_size[j]) if explain else '',
+                predicted_outcome=predicted_outcome[j],
+                confidence=float(ml_confidence[j]),
+                recommended_size_usd=max(0.0, float(recommended_size[j])),
+                ml_confidence=float(ml_confidence[j]),
+                is_cheaper_outcome=bool(is_cheaper[j]),
+                is_active_hour=bool(is_active_hour[j]),
+                outcome_match=bool(outcome_match[j]),
+            )
+        return decisions
+    
+    def score_many(self, market_data_list: List[Union[Dict, MarketData]], explain: bool = False,
+                   chunk_size: int = 256) -> List[Decision]:
+        """
+        Decide on many trades, scoring chunks of them on parallel threads
         
-        # Outcome matches prediction
-        if outcome_match:
-            reasons.append('Trader outcome matches ML prediction')
-            execute = True
-        else:
-            reasons.append(f'Trader outcome ({trader_outcome}) differs from ML ({predicted_outcome})')
-            # Still execute if confidence is very high
-            if ml_confidence >= 0.95:
-                reasons.append('Executing despite mismatch due to very high confidence')
-                execute = True
-        
-        # Cheaper outcome preference
-        if is_cheaper:
-            reasons.append('Buying cheaper outcome (pattern match)')
-        else:
-            reasons.append('Not buying cheaper outcome')
-            # Reduce confidence if not cheaper
-            if ml_confidence < 0.90:
-                execute = False
-                reasons.append('Low confidence + not cheaper = skip')
-        
-        # Active hour bonus
-        if is_active_hour:
-            reasons.append(f'Active trading hour ({hour}:00)')
-        else:
-            reasons.append(f'Less active hour ({hour}:00)')
-            # Slightly reduce confidence outside active hours
-            if ml_confidence < 0.90:
-                execute = False
-                reasons.append('Low confidence + inactive hour = skip')
-        
-        # Size validation
-        if recommended_size < min_size:
-            execute = False
-            reasons.append(f'Recommended size (${recommended_size:.2f}) below minimum (${min_size})')
-        elif recommended_size > available_balance * 0.95:
-            recommended_size = available_balance * 0.95
-            reasons.append(f'Capped size to available balance')
-        
-        # Final decision
-        if execute:
-            reason = ' | '.join(reasons)
-        else:
-            reason = ' | '.join(reasons)
-        
-        return {
-            'execute': execute,
-            'reason': reason,
-            'predicted_outcome': predicted_outcome,
-            'confidence': ml_confidence,
-            'recommended_size_usd': max(0, recommended_size),
-            'ml_confidence': ml_confidence,
-            'is_cheaper_outcome': is_cheaper,
-            'is_active_hour': is_active_hour,
-            'outcome_match': outcome_match
-        }
+        Each chunk of chunk_size trades goes through should_execute_trades_batch
+        on its own thread; model prediction runs outside the GIL, so the chunks
+        overlap on multi-core machines. Decisions come back in input order.
+        """
+        chunks = [market_data_list[i:i + chunk_size] for i in range(0, len(market_data_list), chunk_size)]
+        if len(chunks) <= 1 or not self.load_models():
+            return self.should_execute_trades_batch(market_data_list, explain=explain)
+        
+        # Compile once here rather than in every thread's first batch
+        self._compile_predictors()
+        n_jobs = min(len(chunks), os.cpu_count() or 1)
+        results = joblib.Parallel(n_jobs=n_jobs, prefer='threads')(
+            joblib.delayed(self.should_execute_trades_batch)(chunk, explain) for chunk in chunks
+        )
+        return [decision for decisions in results for decision in decisions]
     
-    def get_trade_recommendation(self, market_data: Dict) -> Dict:
+    def get_trade_recommendation(self, market_data: Union[Dict, MarketData]) -> Dict:
         """
         Get detailed trade recommendation without execution decision
         
         Returns:
             Dictionary with all analysis and recommendations
         """
-        decision = self.should_execute_trade(market_data)
+        market_data = _as_market_data(market_data)
+        hour, day_of_week = _time_features(market_data)
+        decision = self.should_execute_trade(market_data, (hour, day_of_week), explain=True)
         
         # Add additional analysis
-        price = market_data.get('price', 0.5)
-        hour = datetime.fromtimestamp(market_data.get('timestamp', 0)).hour if market_data.get('timestamp') else datetime.now().hour
+        price = market_data.price
         
         recommendation = {
-            **decision,
+            **_decision_dict(decision),
             'analysis': {
                 'price': price,
                 'price_distance_from_50': abs(price - 0.5),
                 'hour': hour,
-                'is_cheaper_outcome': decision.get('is_cheaper_outcome', False),
-                'is_active_hour': decision.get('is_active_hour', False),
+                'is_cheaper_outcome': bool(decision.is_cheaper_outcome),
+                'is_active_hour': bool(decision.is_active_hour),
             }
         }
         
@@ -288,50 +574,47 @@ class MLTradingAlgorithm:
         
         return recommendation
 
+def _dumps(decision):
+    """One line of JSON for a Decision."""
+    return orjson.dumps(_decision_dict(decision), option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def _error_decision(reason):
+    """Decision reported when a request could not be evaluated."""
+    return Decision(
+        execute=False,
+        reason=reason,
+        predicted_outcome=None,
+        confidence=0.0,
+        recommended_size_usd=0.0,
+        ml_confidence=0.0
+    )
+
 def main():
     """CLI interface - reads JSON from stdin"""
     import sys
     
     algorithm = MLTradingAlgorithm()
     if not algorithm.load_models():
-        print(json.dumps({
-            'execute': False,
-            'reason': 'Models not loaded',
-            'predicted_outcome': None,
-            'confidence': 0.0,
-            'recommended_size_usd': 0.0,
-            'ml_confidence': 0.0
-        }), file=sys.stderr)
+        print(_dumps(_error_decision('Models not loaded')), file=sys.stderr)
         sys.exit(1)
     
     try:
         # Read JSON from stdin
-        input_data = sys.stdin.read()
+        input_data = sys.stdin.buffer.read()
         if not input_data:
             raise ValueError("No input data")
         
-        market_data = json.loads(input_data)
-        decision = algorithm.should_execute_trade(market_data)
-        print(json.dumps(decision))
-    except json.JSONDecodeError as e:
-        print(json.dumps({
-            'execute': False,
-            'reason': f'Invalid JSON: {str(e)}',
-            'predicted_outcome': None,
-            'confidence': 0.0,
-            'recommended_size_usd': 0.0,
-            'ml_confidence': 0.0
-        }), file=sys.stderr)
+        market_data = _market_data_decoder.decode(input_data)
+        decision = algorithm.should_execute_trade(market_data, explain=True)
+        print(_dumps(decision))
+    except msgspec.ValidationError as e:
+        print(_dumps(_error_decision(f'Error: {str(e)}')), file=sys.stderr)
+        sys.exit(1)
+    except msgspec.DecodeError as e:
+        print(_dumps(_error_decision(f'Invalid JSON: {str(e)}')), file=sys.stderr)
         sys.exit(1)
     except Exception as e:
-        print(json.dumps({
-            'execute': False,
-            'reason': f'Error: {str(e)}',
-            'predicted_outcome': None,
-            'confidence': 0.0,
-            'recommended_size_usd': 0.0,
-            'ml_confidence': 0.0
-        }), file=sys.stderr)
+        print(_dumps(_error_decision(f'Error: {str(e)}')), file=sys.stderr)
         sys.exit(1)
 
 if __name__ == '__main__':
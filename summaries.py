@@ -0,0 +1,50 @@
+"""
+Per-market summaries of BUY trades, shared by analyze_pricesplit.py and
+analyze_individual_markets.py so both compute the same quantities once.
+"""
+
+import pandas as pd
+
+# outcome_normalized value -> key prefix in the summary
+OUTCOME_PREFIXES = {'Up': 'up', 'Down': 'down'}
+
+def compute_market_summary(df):
+    """Summarize BUY trades per market slug.
+
+    df needs slug, outcome_normalized and usdcSize columns; price
+    statistics are included when it also has a price column. Outcomes
+    other than Up/Down only count towards "total".
+
+    Returns {slug: {"up", "down", "total", "up_count", "down_count",
+    "up_mean_volume", "up_std_volume", "up_mean_price", "up_std_price",
+    and the matching "down_*" keys}}.
+    """
+    aggregations = {
+        'count': ('usdcSize', 'size'),
+        'sum': ('usdcSize', 'sum'),
+        'mean_volume': ('usdcSize', 'mean'),
+        'std_volume': ('usdcSize', 'std'),
+    }
+    if 'price' in df:
+        aggregations['mean_price'] = ('price', 'mean')
+        aggregations['std_price'] = ('price', 'std')
+
+    # One grouped pass over the Up/Down trades, pivoted to a column per outcome
+    up_down = df[df['outcome_normalized'].isin(list(OUTCOME_PREFIXES))]
+    stats = (up_down.groupby(['slug', 'outcome_normalized'], observed=True)
+             .agg(**aggregations)
+             .unstack('outcome_normalized'))
+
+    total = df.groupby('slug', observed=True)['usdcSize'].sum()
+    summary = pd.DataFrame({'total': total})
+    for outcome, prefix in OUTCOME_PREFIXES.items():
+        for stat in aggregations:
+            name = prefix if stat == 'sum' else f"{prefix}_{stat}"
+            if (stat, outcome) in stats:
+                summary[name] = stats[(stat, outcome)].reindex(summary.index)
+            else:
+                summary[name] = float('nan')
+        summary[prefix] = summary[prefix].fillna(0.0)
+        summary[f"{prefix}_count"] = summary[f"{prefix}_count"].fillna(0).astype(int)
+
+    return summary.to_dict(orient='index')
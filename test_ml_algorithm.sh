@@ -69,6 +69,39 @@ python3 src/services/mlTradingAlgorithm.py <<EOF
 }
 EOF
 
+echo ""
+echo ""
+
+# Test Case 5: compiled forest predictor matches scikit-learn
+echo "Test 5: Compiled predictor matches scikit-learn (needs numba)"
+echo "----------------------------------------"
+python3 - <<'EOF'
+import sys
+import numpy as np
+sys.path.insert(0, 'src/services')
+from mlTradingAlgorithm import MLTradingAlgorithm
+
+algorithm = MLTradingAlgorithm()
+if not algorithm.load_models():
+    sys.exit(1)
+model = algorithm.model
+model.compile_predictors()
+rng = np.random.default_rng(0)
+for name in ('outcome', 'size'):
+    compiled = model._predictors.get(name)
+    if compiled is None:
+        print(f"{name}: not compiled, skipped")
+        continue
+    features = rng.normal(size=(1000, len(model.feature_layout(name)[0]))).astype(np.float32)
+    if name == 'outcome':
+        match = np.allclose(compiled[1].predict_proba(features), compiled[0].predict_proba(features))
+    else:
+        match = np.allclose(compiled[1].predict(features), compiled[0].predict(features))
+    print(f"{name}: {'match' if match else 'MISMATCH'}")
+    if not match:
+        sys.exit(1)
+EOF
+
 echo ""
 echo ""
 echo "✅ Tests complete!"
@@ -0,0 +1,158 @@
+"""
+Parquet cache of the BUY trades in historical_trades/, shared by
+analyze_individual_markets.py and analyze_pricesplit.py so the JSON
+corpus is parsed once rather than on every run of either script.
+
+Also holds the per-file BUY reader and the cache helpers that
+analyze_buying_patterns.py and analyze_pricesplit.py build on. numpy and
+pandas are imported only by the functions that need them, so the reader
+stays cheap to import for the stdlib pricesplit engine.
+"""
+
+import hashlib
+import math
+import mmap
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import msgspec
+
+# Fields kept from each BUY record; everything else is dropped at ingest
+TRADE_COLUMNS = ('timestamp', 'outcome', 'price', 'usdcSize', 'slug')
+
+class TradeRecord(msgspec.Struct, gc=False):
+    """The subset of a trade record the analyses read; other keys are skipped."""
+    timestamp: int = 0
+    side: str = ''
+    outcome: Optional[str] = None
+    price: float = math.nan
+    usdcSize: float = math.nan
+    slug: Optional[str] = None
+
+# Trade files are arrays of records; firsttimestamp-style files are objects
+_trade_file_decoder = msgspec.json.Decoder(Union[List[TradeRecord], Dict[str, Any]])
+
+def cache_path_for(directory, prefix=".trade_cache_buys", source=None):
+    """Return the Parquet cache path for the current contents of directory.
+
+    The name is keyed on every input file's name, mtime and size and on
+    this module's source, so any change to the JSON corpus or the reader
+    produces a new cache file. Callers that cache their own analysis pass
+    that script's path as source so it is part of the key too.
+    """
+    files = sorted((p.name, p.stat().st_mtime, p.stat().st_size)
+                   for p in Path(directory).glob("*.json"))
+    h = hashlib.sha1(str(files).encode())
+    h.update(Path(__file__).read_bytes())
+    if source is not None:
+        h.update(Path(source).read_bytes())
+    return Path(f"{prefix}_{h.hexdigest()[:16]}.parquet")
+
+def read_buys(json_file):
+    """Load the BUY trades of a single JSON file as TRADE_COLUMNS columns.
+
+    Numeric columns are typed arrays, the others lists. Returns None when
+    the file is skipped or fails to parse.
+    """
+    try:
+        # Decode straight from a read-only memory map into typed structs;
+        # fields outside TradeRecord are never materialized
+        with open(json_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    data = _trade_file_decoder.decode(view)
+    except Exception as e:
+        print(f"Error processing {json_file.name}: {e}")
+        return None
+
+    # Object files (e.g. the firsttimestamp structure) are skipped
+    if not isinstance(data, list):
+        return None
+
+    buy_trades = [t for t in data if t.side == 'BUY']
+    return {
+        'timestamp': array('q', (t.timestamp for t in buy_trades)),
+        'outcome': [t.outcome for t in buy_trades],
+        'price': array('d', (t.price for t in buy_trades)),
+        'usdcSize': array('d', (t.usdcSize for t in buy_trades)),
+        'slug': [t.slug for t in buy_trades],
+    }
+
+def read_all_buys(json_files):
+    """Parse json_files in worker processes and concatenate their columns.
+
+    Returns (columns, files_processed), with columns laid out as read_buys.
+    """
+    columns = {
+        'timestamp': array('q'),
+        'outcome': [],
+        'price': array('d'),
+        'usdcSize': array('d'),
+        'slug': [],
+    }
+    files_processed = 0
+    with ProcessPoolExecutor() as executor:
+        for file_columns in executor.map(read_buys, json_files, chunksize=8):
+            if file_columns is None:
+                continue
+            for name in TRADE_COLUMNS:
+                columns[name].extend(file_columns[name])
+            files_processed += 1
+    return columns, files_processed
+
+def load_cached(cache_path, build):
+    """Return the DataFrame cached at cache_path, or build() and cache it.
+
+    build may return None when there is nothing to cache. Without a Parquet
+    engine the frame is still returned, just not written. Writing a cache
+    deletes the files it supersedes, i.e. those cache_path_for named with the
+    same prefix for older data or code.
+    """
+    import pandas as pd
+
+    if cache_path.exists():
+        print(f"Loading cached trade data from {cache_path}...")
+        return pd.read_parquet(cache_path)
+
+    df = build()
+    if df is not None:
+        try:
+            df.to_parquet(cache_path, compression='zstd')
+        except ImportError as e:
+            # No Parquet engine installed; run uncached
+            print(f"Skipping trade cache: {e}")
+        else:
+            prefix = cache_path.name.rsplit('_', 1)[0]
+            for stale in cache_path.parent.glob(f"{prefix}_{'?' * 16}.parquet"):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+    return df
+
+def _build_buys_frame(directory):
+    """Parse the BUY trades of directory into the cached DataFrame layout."""
+    import numpy as np
+    import pandas as pd
+
+    # Skip firsttimestamp.json as it has different structure
+    json_files = sorted(f for f in Path(directory).glob("*.json") if f.name != "firsttimestamp.json")
+    columns, files_processed = read_all_buys(json_files)
+
+    df = pd.DataFrame({
+        'timestamp': np.frombuffer(columns['timestamp'], dtype=np.int64),
+        'outcome': pd.Categorical(columns['outcome']),
+        'price': np.frombuffer(columns['price'], dtype=np.float64),
+        'usdcSize': np.frombuffer(columns['usdcSize'], dtype=np.float64),
+        'slug': pd.Categorical(columns['slug']),
+    })
+    print(f"Processed {files_processed} files")
+    print(f"Total BUY transactions: {len(df)}")
+    return df
+
+def load_or_build_cache(directory):
+    """Load the BUY trades of directory as a DataFrame.
+
+    Reads the Parquet cache when it matches the current files; otherwise
+    parses the JSON in worker processes and writes the cache.
+    """
+    return load_cached(cache_path_for(directory), lambda: _build_buys_frame(directory))